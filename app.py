@@ -3,13 +3,29 @@ WorldSummarize Web Application
 Serves the PDF document through a web interface with automatic updates
 """
 
-from flask import Flask, render_template, send_file, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
 from flask_cors import CORS
 import os
+import hmac
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 import logging
+import time
+
+from config import NEWS_SOURCES, SETTINGS
+from assets import AssetCache, content_etag
+from archive_store import EditionStore, edition_id
+from custom_editions import CustomEditions
+from archive_catalog import ArchiveCatalog
+from events import EditionNotifier
+from feed_health import FeedHealth
+from feed_schedule import FeedSchedule
+from publisher import CurrentEdition
+from jobs import JobQueue
+from metrics import REGISTRY, prometheus_text
+from renderers import mimetype, render
+from search_index import SearchIndex, parse_date
 
 app = Flask(__name__)
 CORS(app)
@@ -23,8 +39,131 @@ logger = logging.getLogger(__name__)
 
 # Configuration
 PDF_PATH = 'world_summary.pdf'
+HTML_PATH = 'world_summary.html'
+JSON_PATH = 'world_summary.json'
 ARCHIVE_PATH = 'archive/'
 
+# Fixed output paths, used until the first versioned edition is published
+LATEST_PATHS = {'pdf': PDF_PATH, 'html': HTML_PATH, 'json': JSON_PATH}
+
+# Pointer to the versioned files of the current edition, swapped atomically by the generator
+edition = CurrentEdition()
+
+# Archived editions, listed from the catalog the generator maintains
+catalog = ArchiveCatalog(archive_path=ARCHIVE_PATH)
+
+# Compact documents of archived editions whose files retention has removed
+edition_store = EditionStore()
+
+# Editions limited to chosen categories, sources and length, rendered once per edition and parameters
+custom_editions = CustomEditions(edition)
+
+# Pushes new-edition events to connected browsers
+notifier = EditionNotifier(edition.path)
+
+# Generation requests, picked up by whichever scheduler holds the generator lock
+jobs = JobQueue()
+
+# Hot published files, held in memory and revalidated with one stat() per request
+assets = AssetCache(SETTINGS.get('asset_cache_bytes'))
+
+# Full-text index of published articles, filled by the generator as it publishes
+search_index = SearchIndex()
+
+
+# Profile of the run that produced the current edition
+_profile = {'path': None, 'snapshot': None}
+
+
+def last_run_profile():
+    """Return the metrics snapshot of the run behind the current edition, or None"""
+    pointer = edition.get()
+    path = pointer.get('profile') if pointer else None
+    if path is None:
+        return None
+    if path != _profile['path']:
+        # The profile may be gone after a cleanup; the live metrics are exported without it
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable run profile {path}: {str(e)}")
+            return None
+        _profile['snapshot'], _profile['path'] = snapshot, path
+    return _profile['snapshot']
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unknown'
+        REGISTRY.observe('http_request_seconds', time.perf_counter() - started, endpoint=endpoint)
+        REGISTRY.inc('http_requests_total', endpoint=endpoint, status=response.status_code)
+    return response
+
+
+def send_asset(path, mimetype, max_age=0, published=None):
+    """Serve a file from the asset cache with ETag, Range and gzip support, or None if missing"""
+    asset = assets.get(path, published)
+    if asset is None:
+        return None
+    
+    # Byte ranges always refer to the identity encoding
+    use_gzip = (asset.gzipped is not None and 'Range' not in request.headers
+                and request.accept_encodings.quality('gzip') > 0)
+    data = asset.gzipped if use_gzip else asset.data
+    
+    response = Response(data, content_type=mimetype)
+    response.set_etag(f"{asset.etag}-gz" if use_gzip else asset.etag)
+    response.vary.add('Accept-Encoding')
+    if use_gzip:
+        response.content_encoding = 'gzip'
+    return conditional_response(response, len(data), asset.mtime, max_age)
+
+
+def send_rendered(data, mimetype, max_age=0, etag=None):
+    """Serve bytes rendered on request with the same ETag and Range support as files"""
+    response = Response(data, content_type=mimetype)
+    response.set_etag(etag or content_etag(data))
+    return conditional_response(response, len(data), None, max_age)
+
+
+def conditional_response(response, length, mtime, max_age):
+    """Add caching headers to a response and answer conditional and Range requests"""
+    if mtime is not None:
+        response.last_modified = datetime.fromtimestamp(mtime, timezone.utc)
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        # Editions change hourly, so clients revalidate and usually get a 304
+        response.cache_control.no_cache = True
+    return response.make_conditional(request, accept_ranges=True, complete_length=length)
+
+
+def serve_edition(output_format):
+    """Serve the latest edition in one output format"""
+    try:
+        # Resolve the pointer once, so a reader always gets one consistent edition
+        pointer = edition.get()
+        if pointer is not None:
+            published = pointer['files'][output_format]
+            response = send_asset(published['path'], mimetype(output_format), published=published)
+        else:
+            response = send_asset(LATEST_PATHS[output_format], mimetype(output_format))
+        if response is None:
+            return jsonify({'error': 'Edition not found'}), 404
+        return response
+    except Exception as e:
+        logger.error(f"Error serving {output_format} edition: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/')
 def index():
     """Serve the main web page"""
@@ -33,69 +172,209 @@ def index():
 @app.route('/api/pdf')
 def serve_pdf():
     """Serve the current PDF document"""
+    return serve_edition('pdf')
+
+@app.route('/api/html')
+def serve_html():
+    """Serve the current edition as a lightweight HTML page"""
+    return serve_edition('html')
+
+@app.route('/api/json')
+def serve_json():
+    """Serve the current edition as a JSON feed"""
+    return serve_edition('json')
+
+@app.route('/api/edition')
+def serve_custom_edition():
+    """Serve the current edition limited to chosen categories, sources and number of pages"""
     try:
-        if os.path.exists(PDF_PATH):
-            return send_file(PDF_PATH, mimetype='application/pdf')
-        else:
-            return jsonify({'error': 'PDF not found'}), 404
+        output_format = request.args.get('format', 'pdf')
+        output = custom_editions.get(request.args.get('categories'), request.args.get('sources'),
+                                     request.args.get('pages'), output_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        logger.error(f"Error serving PDF: {str(e)}")
+        logger.error(f"Error building custom edition: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    if output is None:
+        return jsonify({'error': 'No stories match this edition'}), 404
+    data, etag = output
+    return send_rendered(data, mimetype(output_format), etag=etag)
+
+@app.route('/api/sources')
+def get_sources():
+    """Report the health of every configured feed, sickest first"""
+    try:
+        # Both files are written by the generator as it polls
+        feed_urls = NEWS_SOURCES['rss_feeds']
+        schedule = FeedSchedule()
+        sources = FeedHealth().report(feed_urls)
+        for source in sources:
+            feed = schedule.feeds.get(source['url'], {})
+            source['poll_interval_seconds'] = feed.get('interval')
+            source['next_poll'] = feed.get('next_poll')
+        return jsonify({
+            'sources': sources,
+            'count': len(sources),
+            'needs_attention': sum(1 for source in sources if source['needs_attention'])
+        })
+    except Exception as e:
+        logger.error(f"Error reporting sources: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/status')
 def get_status():
     """Get the current status of the document"""
     try:
+        pointer = edition.get()
         status = {
-            'pdf_exists': os.path.exists(PDF_PATH),
+            'pdf_exists': pointer is not None or os.path.exists(PDF_PATH),
+            'edition': None,
             'last_updated': None,
             'file_size': None,
             'archive_count': 0
         }
         
-        if status['pdf_exists']:
+        if pointer is not None:
+            status['edition'] = pointer['id']
+            status['last_updated'] = pointer['generated_at']
+            status['file_size'] = pointer['files']['pdf']['size']
+        elif status['pdf_exists']:
             stat = os.stat(PDF_PATH)
             status['last_updated'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
             status['file_size'] = stat.st_size
         
-        # Count archive files
-        if os.path.exists(ARCHIVE_PATH):
-            status['archive_count'] = len([f for f in os.listdir(ARCHIVE_PATH) if f.endswith('.pdf')])
+        status['archive_count'] = catalog.count()
         
         return jsonify(status)
     except Exception as e:
         logger.error(f"Error getting status: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/events')
+def edition_events():
+    """Stream a Server-Sent Event whenever a new edition is published"""
+    response = Response(notifier.stream(request.headers.get('Last-Event-ID')), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    # Keep reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/refresh', methods=['POST'])
+def request_refresh():
+    """Ask the generator for a new edition"""
+    try:
+        # CORS is open to every origin, so runs are only triggered with the
+        # token, and not at all until one is configured
+        token = SETTINGS.get('refresh_token') or os.environ.get('WORLDSUMMARIZE_REFRESH_TOKEN')
+        if not token:
+            return jsonify({'error': 'Refresh is disabled until a refresh token is configured'}), 503
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+            return jsonify({'error': 'A valid refresh token is required'}), 401
+
+        # Full runs crawl every source, so they are spaced out however often they are asked for
+        last_run = jobs.last_run()
+        wait = SETTINGS.get('refresh_min_interval_seconds', 600) - (time.time() - last_run) if last_run else 0
+        if wait > 0:
+            response = jsonify({'error': f"A run happened recently; try again in {int(wait) + 1} seconds"})
+            response.headers['Retry-After'] = str(int(wait) + 1)
+            return response, 429
+
+        # A request made while one is already waiting joins it instead of queueing another run
+        job_id, created = jobs.enqueue(reason='api')
+        return jsonify({'job': job_id, 'queued': created, 'status': jobs.get(job_id)['status']}), 202
+    except Exception as e:
+        logger.error(f"Error queueing refresh: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>')
+def get_job(job_id):
+    """Get the status of a generation job"""
+    try:
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Error getting job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Export web and last-run metrics in the Prometheus text format"""
+    try:
+        text = prometheus_text(REGISTRY.snapshot())
+        profile = last_run_profile()
+        if profile is not None:
+            text += prometheus_text(profile, 'worldsummarize_last_run_')
+        return Response(text, content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        logger.error(f"Error exporting metrics: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/archives')
 def list_archives():
-    """List all archived PDFs"""
+    """List archived PDFs, newest first, a page at a time"""
     try:
-        archives = []
-        if os.path.exists(ARCHIVE_PATH):
-            for filename in sorted(os.listdir(ARCHIVE_PATH), reverse=True):
-                if filename.endswith('.pdf'):
-                    filepath = os.path.join(ARCHIVE_PATH, filename)
-                    stat = os.stat(filepath)
-                    archives.append({
-                        'filename': filename,
-                        'timestamp': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        'size': stat.st_size
-                    })
-        return jsonify({'archives': archives[:20]})  # Return last 20 archives
+        before = request.args.get('before')
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        archives, has_more = catalog.page(before, limit)
+        # Pass next_before back as ?before= to get the following page
+        return jsonify({
+            'archives': archives,
+            'next_before': archives[-1]['timestamp'] if has_more else None
+        })
     except Exception as e:
         logger.error(f"Error listing archives: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/search')
+def search_articles():
+    """Search published articles by text, date range and category"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search query ?q='}), 400
+    try:
+        date_from = parse_date(request.args.get('from'))
+        date_to = parse_date(request.args.get('to'), end_of_day=True)
+    except ValueError:
+        return jsonify({'error': 'Dates must be ISO 8601, e.g. 2025-01-31 or 2025-01-31T12:00:00Z'}), 400
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        results, total = search_index.search(query, date_from, date_to, request.args.get('category'),
+                                             limit, offset)
+        return jsonify({
+            'query': query,
+            'total': total,
+            'results': results,
+            # Pass next_offset back as ?offset= to get the following page
+            'next_offset': offset + limit if offset + limit < total else None
+        })
+    except Exception as e:
+        logger.error(f"Error searching articles: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/archive/<filename>')
 def serve_archive(filename):
-    """Serve an archived PDF"""
+    """Serve an archived edition as PDF, HTML or JSON"""
     try:
-        filepath = os.path.join(ARCHIVE_PATH, filename)
-        if os.path.exists(filepath) and filename.endswith('.pdf'):
-            return send_file(filepath, mimetype='application/pdf')
-        else:
+        response = None
+        archived_id = edition_id(filename)
+        output_format = filename.rsplit('.', 1)[-1]
+        if output_format in LATEST_PATHS and filename == f"world_summary_{archived_id}.{output_format}":
+            # Archived editions never change, so clients may keep them for a day
+            response = send_asset(os.path.join(ARCHIVE_PATH, filename), mimetype(output_format), max_age=86400)
+            if response is None:
+                # Older editions are kept as compact documents and rendered on request
+                document = edition_store.get(archived_id)
+                if document is not None:
+                    response = send_rendered(render(document, output_format), mimetype(output_format),
+                                             max_age=86400)
+        if response is None:
             return jsonify({'error': 'Archive not found'}), 404
+        return response
     except Exception as e:
         logger.error(f"Error serving archive: {str(e)}")
         return jsonify({'error': str(e)}), 500
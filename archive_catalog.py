@@ -0,0 +1,135 @@
+"""
+Archive catalog for WorldSummerize
+A JSON manifest of archived editions, so listing them never scans the archive directory
+"""
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+from config import SETTINGS
+from feed_cache import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def archive_entry(filepath):
+    """Return the catalog entry of an archived file"""
+    stat = os.stat(filepath)
+    return {
+        'filename': os.path.basename(filepath),
+        'timestamp': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        'size': stat.st_size
+    }
+
+
+class ArchiveCatalog:
+    """Archived editions ordered by timestamp, reloaded only when the manifest changes"""
+
+    # The generator appends to the manifest and swaps it into place
+    # atomically, so readers see either the old or the new catalog. A page is
+    # found by bisecting the sorted timestamps, so the cost of a request
+    # depends on the page size and not on how many editions are archived.
+
+    def __init__(self, path=None, archive_path=None):
+        self.archive_path = archive_path or SETTINGS.get('archive_path', 'archive/')
+        self.path = path or SETTINGS.get('archive_catalog_path', os.path.join(self.archive_path, 'catalog.json'))
+        self.entries = []
+        self.timestamps = []
+        self.mtime = None
+        self.lock = threading.Lock()
+
+    def _set_entries(self, entries):
+        entries.sort(key=lambda entry: entry['timestamp'])
+        self.entries = entries
+        self.timestamps = [entry['timestamp'] for entry in entries]
+
+    def _scan(self, exclude=()):
+        """Build the catalog from the archive directory, for archives made before it existed"""
+        entries = []
+        if os.path.isdir(self.archive_path):
+            for filename in os.listdir(self.archive_path):
+                if filename.endswith('.pdf') and filename not in exclude:
+                    entries.append(archive_entry(os.path.join(self.archive_path, filename)))
+        return entries
+
+    def refresh(self):
+        """Reload the manifest if it changed since it was last read"""
+        with self.lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime == self.mtime:
+                return
+            if mtime is None:
+                # Until the generator seeds the manifest there is nothing archived to list
+                self._set_entries([])
+                self.mtime = None
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._set_entries(json.load(f)['archives'])
+                self.mtime = mtime
+            except Exception as e:
+                logger.error(f"Error reading archive catalog {self.path}: {str(e)}")
+
+    def seed(self, exclude=()):
+        """Write the manifest from one directory scan if it does not exist yet; called by the generator"""
+        # The live edition's files sit in the same directory but are not archived yet
+        with self.lock:
+            if os.path.exists(self.path):
+                return
+            self._set_entries(self._scan(set(exclude)))
+            self.save()
+
+    def save(self):
+        """Write the catalog atomically"""
+        try:
+            write_json_atomic(self.path, {'archives': self.entries})
+            self.mtime = os.stat(self.path).st_mtime_ns
+        except Exception as e:
+            logger.error(f"Error saving archive catalog {self.path}: {str(e)}")
+
+    def add(self, filepath):
+        """Record a newly archived file"""
+        self.refresh()
+        entry = archive_entry(filepath)
+        with self.lock:
+            if any(existing['filename'] == entry['filename'] for existing in self.entries[-50:]):
+                return
+            self._set_entries(self.entries + [entry])
+            self.save()
+
+    def remove(self, filenames):
+        """Forget archived files, as retention drops them"""
+        self.refresh()
+        filenames = set(filenames)
+        with self.lock:
+            entries = [entry for entry in self.entries if entry['filename'] not in filenames]
+            if len(entries) != len(self.entries):
+                self._set_entries(entries)
+                self.save()
+
+    def all(self):
+        """Return every catalog entry, oldest first"""
+        self.refresh()
+        with self.lock:
+            return list(self.entries)
+
+    def count(self):
+        """Return the number of archived editions"""
+        self.refresh()
+        return len(self.entries)
+
+    def page(self, before=None, limit=20):
+        """Return up to limit entries older than the before timestamp, newest first"""
+        self.refresh()
+        with self.lock:
+            entries, timestamps = self.entries, self.timestamps
+        end = bisect_left(timestamps, before) if before else len(timestamps)
+        start = max(0, end - limit)
+        return entries[start:end][::-1], start > 0
@@ -0,0 +1,244 @@
+"""
+Archive store for WorldSummerize
+Keeps archived editions as compact, deduplicated documents and thins them out by age
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# An edition is its document with every article replaced by the hash of its
+# entry. Entries are stored once however many hourly editions repeat them.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS editions (
+    id TEXT PRIMARY KEY,
+    generated_at TEXT NOT NULL,
+    data BLOB NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edition_entries (
+    edition_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (edition_id, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_edition_entries_hash ON edition_entries (hash);
+"""
+
+# Files published for every edition, each possibly with a .gz variant
+EDITION_FILES = ('pdf', 'html', 'json', 'profile.json', 'articles.json')
+
+
+def pack(value):
+    """Return a compressed JSON encoding of a value"""
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def unpack(data):
+    """Decode a value stored with pack()"""
+    return json.loads(zlib.decompress(data))
+
+
+def entry_hash(entry):
+    """Return the content hash of an article entry"""
+    return hashlib.sha1(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def edition_id(filename):
+    """Return the edition id of an archived file name such as world_summary_20250101_120000.pdf"""
+    if not filename.startswith('world_summary_'):
+        return None
+    return filename[len('world_summary_'):].split('.', 1)[0] or None
+
+
+def edition_files(archive_path, edition):
+    """Return the paths of every file published for an edition"""
+    paths = []
+    for suffix in EDITION_FILES:
+        path = os.path.join(archive_path, f"world_summary_{edition}.{suffix}")
+        paths += [path, f"{path}.gz"]
+    return paths
+
+
+def retained(entries, now=None):
+    """Return the file names of catalog entries kept by the hourly, daily and weekly retention tiers"""
+    # Everything from the last hourly_days days, then the newest edition of
+    # each day, then the newest of each ISO week; weekly editions older than
+    # weekly_weeks are dropped (0 keeps them forever)
+    now = now or datetime.now()
+    hourly = now - timedelta(days=SETTINGS.get('archive_hourly_days', 2))
+    daily = now - timedelta(days=SETTINGS.get('archive_daily_days', 30))
+    weekly_weeks = SETTINGS.get('archive_weekly_weeks', 52)
+    weekly = now - timedelta(weeks=weekly_weeks) if weekly_weeks else None
+
+    keep = set()
+    days = set()
+    weeks = set()
+    for entry in sorted(entries, key=lambda entry: entry['timestamp'], reverse=True):
+        moment = datetime.fromisoformat(entry['timestamp'])
+        if moment >= hourly:
+            keep.add(entry['filename'])
+        elif moment >= daily:
+            if moment.date() not in days:
+                days.add(moment.date())
+                keep.add(entry['filename'])
+        elif weekly is None or moment >= weekly:
+            week = moment.isocalendar()[:2]
+            if week not in weeks:
+                weeks.add(week)
+                keep.add(entry['filename'])
+    return keep
+
+
+class EditionStore:
+    """SQLite store of archived edition documents, from which any format can be rendered again"""
+
+    # Every call opens its own connection, so the web app can read editions
+    # from any thread while the generator stores new ones.
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('edition_store_path', 'archive/editions.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add(self, document):
+        """Store an edition document, sharing the entries it has in common with earlier editions"""
+        sections = []
+        entries = {}
+        for section in document['sections']:
+            hashes = []
+            for entry in section['articles']:
+                key = entry_hash(entry)
+                entries[key] = entry
+                hashes.append(key)
+            sections.append({'category': section['category'], 'articles': hashes})
+        compact = dict(document, sections=sections)
+
+        with closing(self._connect()) as conn, conn:
+            existing = set()
+            keys = list(entries)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                existing.update(row[0] for row in conn.execute(
+                    f"SELECT hash FROM entries WHERE hash IN ({', '.join('?' * len(chunk))})", chunk))
+            conn.executemany("INSERT INTO entries (hash, data) VALUES (?, ?)",
+                             [(key, pack(entry)) for key, entry in entries.items() if key not in existing])
+            conn.execute("INSERT OR REPLACE INTO editions (id, generated_at, data, stored_at) VALUES (?, ?, ?, ?)",
+                         (document['id'], document['generated_at'], pack(compact), time.time()))
+            conn.executemany("INSERT OR IGNORE INTO edition_entries (edition_id, hash) VALUES (?, ?)",
+                             [(document['id'], key) for key in entries])
+        logger.info(f"Stored edition {document['id']} ({len(entries) - len(existing)} new of {len(entries)} entries)")
+
+    def get(self, edition):
+        """Return a stored edition document, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data FROM editions WHERE id = ?", (edition,)).fetchone()
+            if row is None:
+                return None
+            document = unpack(row[0])
+            hashes = {key for section in document['sections'] for key in section['articles']}
+            entries = {}
+            keys = list(hashes)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                entries.update((key, unpack(data)) for key, data in conn.execute(
+                    f"SELECT hash, data FROM entries WHERE hash IN ({', '.join('?' * len(chunk))})", chunk))
+        for section in document['sections']:
+            section['articles'] = [entries[key] for key in section['articles'] if key in entries]
+        return document
+
+    def has(self, edition):
+        """Return whether an edition is stored"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM editions WHERE id = ?", (edition,)).fetchone() is not None
+
+    def remove(self, editions):
+        """Delete editions and every entry no remaining edition refers to"""
+        editions = list(editions)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM editions WHERE id = ?", [(edition,) for edition in editions])
+            conn.executemany("DELETE FROM edition_entries WHERE edition_id = ?", [(edition,) for edition in editions])
+            conn.execute("DELETE FROM entries WHERE NOT EXISTS "
+                         "(SELECT 1 FROM edition_entries WHERE edition_entries.hash = entries.hash)")
+
+
+def remove_files(paths):
+    """Delete files, ignoring those already gone; return the bytes freed"""
+    freed = 0
+    for path in paths:
+        try:
+            freed += os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return freed
+
+
+def import_document(store, archive_path, edition):
+    """Store an edition archived before the store existed from its JSON document, if it has one"""
+    path = os.path.join(archive_path, f"world_summary_{edition}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            store.add(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not import archived edition {edition}: {str(e)}")
+
+
+def enforce_retention(catalog, store, now=None):
+    """Drop archived editions outside the retention tiers and compact the older ones that remain"""
+    archive_path = catalog.archive_path
+    entries = catalog.all()
+    keep = retained(entries, now)
+    dropped = [entry for entry in entries if entry['filename'] not in keep]
+
+    freed = 0
+    if dropped:
+        editions = [edition_id(entry['filename']) for entry in dropped]
+        catalog.remove(entry['filename'] for entry in dropped)
+        store.remove(edition for edition in editions if edition)
+        for edition in editions:
+            if edition:
+                freed += remove_files(edition_files(archive_path, edition))
+
+    # Only the most recent archived editions keep their published files, for
+    # readers still holding the previous pointer; the others are rendered
+    # again from the store when someone asks for them
+    kept = sorted((entry for entry in entries if entry['filename'] in keep),
+                  key=lambda entry: entry['timestamp'], reverse=True)
+    compacted = 0
+    for entry in kept[SETTINGS.get('archive_keep_files', 2):]:
+        edition = edition_id(entry['filename'])
+        if edition and not store.has(edition):
+            import_document(store, archive_path, edition)
+        if edition and store.has(edition):
+            removed = remove_files(edition_files(archive_path, edition))
+            if removed:
+                freed += removed
+                compacted += 1
+
+    if dropped or compacted:
+        logger.info(f"Archive retention dropped {len(dropped)} editions and compacted {compacted}, "
+                    f"freeing {freed / 1048576:.1f} MB")
+    return len(dropped), compacted
@@ -0,0 +1,135 @@
+"""
+Persistent article store for WorldSummerize
+Keeps processed articles in SQLite so each run only processes new or changed entries
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from config import SETTINGS
+from cleaner import CLEANER_VERSION
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    link TEXT,
+    source TEXT,
+    published TEXT,
+    category TEXT,
+    scores TEXT,
+    classifier TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_last_seen ON articles (last_seen);
+"""
+
+# Columns added after the first release, created on stores that predate them
+MIGRATIONS = {
+    'scores': "ALTER TABLE articles ADD COLUMN scores TEXT",
+}
+
+
+def article_identity(entry, feed_url=''):
+    """Return a stable identity for a feed entry from its GUID, link or title"""
+    key = entry.get('id') or entry.get('link') or f"{feed_url}|{entry.get('title', '')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def content_hash(title, summary):
+    """Return a hash of the raw article fields used to detect changed entries"""
+    # Entries cleaned by an older cleaner count as changed and are cleaned again
+    return hashlib.sha1(f"{CLEANER_VERSION}\x00{title}\x00{summary}".encode('utf-8')).hexdigest()
+
+
+class ArticleStore:
+    """SQLite-backed store of cleaned and categorized articles keyed by identity"""
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('article_store_path', 'cache/articles.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        with self.conn:
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    self.conn.execute(statement)
+
+    def lookup(self, ids):
+        """Return stored rows for the given identities as a dict keyed by id"""
+        rows = {}
+        ids = list(ids)
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for row in self.conn.execute(f"SELECT * FROM articles WHERE id IN ({placeholders})", chunk):
+                rows[row['id']] = row
+        return rows
+
+    def save(self, articles):
+        """Insert new or changed articles and refresh last_seen for the rest"""
+        now = time.time()
+        records = []
+        for article in articles:
+            published = article.get('published')
+            records.append((
+                article['id'],
+                article['content_hash'],
+                article['title'],
+                article.get('summary', ''),
+                article.get('link', ''),
+                article.get('source', ''),
+                json.dumps(list(published)) if published else None,
+                article.get('category'),
+                json.dumps(article.get('scores', {})),
+                article.get('classifier'),
+                now,
+                now
+            ))
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO articles (id, content_hash, title, summary, link, source, published,
+                                      category, scores, classifier, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    title = excluded.title,
+                    summary = excluded.summary,
+                    link = excluded.link,
+                    source = excluded.source,
+                    published = excluded.published,
+                    category = excluded.category,
+                    scores = excluded.scores,
+                    classifier = excluded.classifier,
+                    last_seen = excluded.last_seen
+            """, records)
+
+    def touch(self, ids):
+        """Mark unchanged articles as seen in the current run"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("UPDATE articles SET last_seen = ? WHERE id = ?",
+                                  ((now, article_id) for article_id in ids))
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
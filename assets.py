@@ -0,0 +1,141 @@
+"""
+Published asset handling for WorldSummerize
+Durable writes with content-hash ETags and gzip variants, and an in-memory LRU for serving them
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# A gzip variant is only kept when it saves at least this fraction of the bytes
+MIN_GZIP_SAVING = 0.1
+
+
+def content_etag(data):
+    """Return the strong ETag of some content"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def write_durable(path, data):
+    """Write bytes to a temporary file, fsync it and rename it into place"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Persist the rename itself; directories cannot be opened on Windows
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def publish_file(path, data):
+    """Durably write a file and its gzip variant, returning its published metadata"""
+    compressed = gzip.compress(data, compresslevel=9)
+    has_gzip = len(compressed) <= len(data) * (1 - MIN_GZIP_SAVING)
+    if has_gzip:
+        write_durable(f"{path}.gz", compressed)
+    write_durable(path, data)
+
+    stat = os.stat(path)
+    return {
+        'path': path,
+        'etag': content_etag(data),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'gzip': has_gzip
+    }
+
+
+class Asset:
+    """The bytes of one version of a file, with its validators"""
+
+    __slots__ = ('data', 'gzipped', 'etag', 'mtime', 'size', 'mtime_ns')
+
+    def __init__(self, data, gzipped, etag, stat):
+        self.data = data
+        self.gzipped = gzipped
+        self.etag = etag
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+    @property
+    def cost(self):
+        return len(self.data) + len(self.gzipped or b'')
+
+
+class AssetCache:
+    """Size-bounded LRU of file contents, reloaded when a file changes on disk"""
+
+    # A hit costs one stat() of the file. ETags come from the metadata
+    # recorded at publish time and are only hashed here for files published
+    # without it, which never change once written.
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or SETTINGS.get('asset_cache_bytes', 32 * 1024 * 1024)
+        self.assets = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def _load(self, path, stat, published):
+        with open(path, 'rb') as f:
+            data = f.read()
+        gzipped = None
+        if published and published['size'] == stat.st_size and published['mtime_ns'] == stat.st_mtime_ns:
+            etag = published['etag']
+            if published['gzip']:
+                try:
+                    with open(f"{path}.gz", 'rb') as f:
+                        gzipped = f.read()
+                except OSError:
+                    gzipped = None
+        else:
+            etag = content_etag(data)
+        return Asset(data, gzipped, etag, stat)
+
+    def get(self, path, published=None):
+        """Return the current Asset of a file, or None when it does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self.lock:
+            asset = self.assets.get(path)
+            if asset is not None and asset.size == stat.st_size and asset.mtime_ns == stat.st_mtime_ns:
+                self.assets.move_to_end(path)
+                return asset
+
+        asset = self._load(path, stat, published)
+        if asset.cost > self.max_bytes:
+            return asset
+
+        with self.lock:
+            previous = self.assets.pop(path, None)
+            if previous is not None:
+                self.size -= previous.cost
+            self.assets[path] = asset
+            self.size += asset.cost
+            while self.size > self.max_bytes:
+                _, evicted = self.assets.popitem(last=False)
+                self.size -= evicted.cost
+        return asset
@@ -0,0 +1,103 @@
+"""
+Text layout benchmark for WorldSummerize
+Compares line breaking from cached glyph widths with per-word reportlab stringWidth calls
+
+Usage: python benchmarks/bench_layout.py [paragraph_count]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from layout import break_lines, get_metrics, paginate
+
+FONT = 'Helvetica'
+SIZE = 10
+WIDTH = 515
+
+
+def make_paragraphs(count, seed=0):
+    """Build deterministic news-like paragraphs of 150-300 words"""
+    rng = random.Random(seed)
+    vocabulary = ('the government said on tuesday that international talks over the ceasefire '
+                  'would resume after officials from both countries met in Geneva where markets '
+                  'reacted to inflation figures and central bank comments about interest rates '
+                  'while researchers published a study on climate change and public health').split()
+    return [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(150, 300))) for _ in range(count)]
+
+
+def stringwidth_break(text, max_width):
+    """Greedy line breaking measuring every candidate line with stringWidth"""
+    lines = []
+    line = ''
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if line and stringWidth(candidate, FONT, SIZE) > max_width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+
+def stringwidth_word_break(text, max_width):
+    """Greedy line breaking with one stringWidth call per word"""
+    lines = []
+    line = []
+    x = 0
+    space = stringWidth(' ', FONT, SIZE)
+    for word in text.split():
+        width = stringWidth(word, FONT, SIZE)
+        if line and x + space + width > max_width:
+            lines.append(' '.join(line))
+            line, x = [], 0
+        x += (space if line else 0) + width
+        line.append(word)
+    if line:
+        lines.append(' '.join(line))
+    return lines
+
+
+def timed(function, paragraphs):
+    start = time.perf_counter()
+    result = [function(paragraph) for paragraph in paragraphs]
+    return result, time.perf_counter() - start
+
+
+def run(count):
+    paragraphs = make_paragraphs(count)
+    metrics = get_metrics(FONT, SIZE)
+
+    _, line_seconds = timed(lambda text: stringwidth_break(text, WIDTH), paragraphs)
+    _, word_seconds = timed(lambda text: stringwidth_word_break(text, WIDTH), paragraphs)
+    # Fresh word cache so the first pass pays for every measurement
+    metrics.words.clear()
+    lines, cached_seconds = timed(lambda text: break_lines([(metrics, text)], WIDTH), paragraphs)
+
+    overflow = sum(1 for paragraph in lines for line in paragraph
+                   if stringWidth(line[0][1], FONT, SIZE) > WIDTH + 1e-6)
+
+    print(f"paragraphs: {count}")
+    print(f"  stringWidth per candidate line: {line_seconds * 1000:8.1f} ms")
+    print(f"  stringWidth per word:           {word_seconds * 1000:8.1f} ms")
+    print(f"  cached glyph widths:            {cached_seconds * 1000:8.1f} ms "
+          f"({word_seconds / cached_seconds:.1f}x faster than per-word stringWidth)")
+    print(f"  overflowing lines:              {overflow}")
+
+    items = [{'type': 'article', 'title': f"Headline {i}", 'summary': paragraph}
+             for i, paragraph in enumerate(paragraphs)]
+    start = time.perf_counter()
+    pages = list(paginate(items, A4, A4[1] - 250))
+    print(f"  paginated into {len(pages)} pages in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
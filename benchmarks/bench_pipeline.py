@@ -0,0 +1,235 @@
+"""
+Pipeline benchmark for WorldSummerize
+Replays feed fixtures through a local server and times each stage, the renderers and the web endpoints
+
+Usage: python benchmarks/bench_pipeline.py [--articles N] [--repeat R] [--tolerance T] [--update-baseline] [--record]
+
+Each benchmark runs R times (3 by default) and its fastest run is compared,
+so one slow sample cannot fail the gate. Exits with status 1 when a stage is
+slower or uses more memory than benchmarks/baseline.json allows (by default
+50% over the baseline).
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from config import SETTINGS
+from fixtures import FixtureServer, configured_feeds, record_fixtures, scaled_feeds
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+FLASK_REQUESTS = 200
+
+# Differences smaller than this are timer noise, whatever the ratio
+MIN_SLOWDOWN_SECONDS = 0.01
+
+# Timed runs of each benchmark; the fastest is the one compared
+REPEAT = 3
+
+
+def measure(function, setup=lambda: (), repeat=REPEAT):
+    """Time the fastest of repeat calls of function, then run it under tracemalloc for its peak memory"""
+    # Timing and memory use separate runs because tracemalloc slows Python down.
+    # The minimum is the run least disturbed by the rest of the machine.
+    timings = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+
+    args = setup()
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def fresh(articles):
+    """Return copies of articles without anything a stage adds"""
+    added = ('category', 'classifier', 'relevance', 'scores', 'cluster_id', 'digest', 'also_reported_by')
+    return [{key: value for key, value in article.items() if key not in added} for article in articles]
+
+
+def run(article_count, repeat=REPEAT):
+    import worldsummerize
+    from clustering import StoryIndex
+    from document import build_document
+    from fetcher import fetch_feeds
+    from publisher import publish_edition
+    import renderers
+    import summarizer
+
+    logging.getLogger().setLevel(logging.WARNING)
+    # Article pages would be crawled from the live sites; time the summaries alone
+    SETTINGS['fetch_article_bodies'] = False
+    # Every fixture is served from one local host, so let each fetch worker keep its connection
+    SETTINGS['fetch_pool_per_host'] = SETTINGS.get('fetch_workers', 16)
+    results = {}
+
+    def record(name, count, seconds, peak):
+        results[name] = {'seconds': seconds, 'count': count, 'throughput': count / seconds if seconds else 0,
+                         'peak_bytes': peak}
+
+    configured = configured_feeds()
+    scaled = scaled_feeds(article_count)
+    with FixtureServer({**configured, **scaled}) as server:
+        # The configured feeds, one scrape_rss_feed call after another
+        urls = [server.url(path) for path in configured]
+        scraped, seconds, peak = measure(lambda: [article for url in urls
+                                                  for article in worldsummerize.scrape_rss_feed(url)],
+                                          repeat=repeat)
+        record('scrape_rss_feed', len(scraped), seconds, peak)
+
+        # Fetch, parse and clean of the scaled synthetic feeds
+        scaled_urls = [server.url(path) for path in scaled]
+        # Lift the per-feed cap, and the run deadline, which is sized for 12 live feeds
+        limits = {key: SETTINGS.get(key) for key in ('max_articles_per_source', 'fetch_deadline_seconds')}
+        SETTINGS.update(max_articles_per_source=article_count, fetch_deadline_seconds=3600)
+
+        def ingest():
+            articles = []
+            for result in fetch_feeds(scaled_urls):
+                if result['error']:
+                    raise RuntimeError(f"fixture {result['url']} failed: {result['error']}")
+                articles.extend(worldsummerize.clean_articles(
+                    worldsummerize.parse_rss_feed(result['url'], result['content'], result['headers'])))
+            return articles
+
+        articles, seconds, peak = measure(ingest, repeat=repeat)
+        SETTINGS.update(limits)
+        record('ingest', len(articles), seconds, peak)
+
+    categorized, seconds, peak = measure(worldsummerize.generate_summary, lambda: (fresh(articles),),
+                                         repeat=repeat)
+    record('generate_summary', len(articles), seconds, peak)
+
+    def cluster(batch):
+        index = StoryIndex(os.path.join(tempfile.mkdtemp(dir='.'), 'stories.db'))
+        try:
+            for i in range(0, len(batch), 100):
+                index.assign(batch[i:i + 100])
+        finally:
+            index.close()
+
+    _, seconds, peak = measure(cluster, lambda: (fresh(articles),), repeat=repeat)
+    record('cluster', len(articles), seconds, peak)
+
+    def summarize_setup():
+        summarizer._cache.clear()
+        return (fresh(articles),)
+
+    _, seconds, peak = measure(summarizer.summarize_batch, summarize_setup, repeat=repeat)
+    record('summarize_batch', len(articles), seconds, peak)
+
+    # The edition as a run would publish it: the top stories of each category
+    edition = {category: items[:SETTINGS.get('max_articles_per_category', 10)]
+               for category, items in categorized.items()}
+    for items in edition.values():
+        for article in items:
+            article['also_reported_by'] = []
+    document, seconds, peak = measure(build_document, lambda: (edition,), repeat=repeat)
+    edition_size = sum(len(section['articles']) for section in document['sections'])
+    record('build_document', edition_size, seconds, peak)
+
+    for output_format in ('pdf', 'html', 'json'):
+        renderer = renderers.RENDERERS[output_format][0]
+        _, seconds, peak = measure(renderer, lambda: (document,), repeat=repeat)
+        record(f"render_{output_format}", edition_size, seconds, peak)
+
+    _, seconds, peak = measure(publish_edition, lambda: (dict(document, id=f"bench_{time.time_ns()}"),),
+                               repeat=repeat)
+    record('publish_edition', 1, seconds, peak)
+
+    # Web endpoints against the edition just published
+    import app
+    client = app.app.test_client()
+    etag = client.get('/api/pdf').headers['ETag']
+    endpoints = [
+        ('/', {}), ('/api/status', {}), ('/api/json', {}), ('/api/json', {'Accept-Encoding': 'gzip'}),
+        ('/api/pdf', {}), ('/api/pdf', {'If-None-Match': etag}), ('/api/pdf', {'Range': 'bytes=0-1023'}),
+        ('/api/archives?limit=20', {}), ('/api/metrics', {})
+    ]
+    for path, headers in endpoints:
+        name = f"GET {path}" + ''.join(f" [{header}]" for header in headers)
+
+        def requests_batch(path=path, headers=headers):
+            for _ in range(FLASK_REQUESTS):
+                response = client.get(path, headers=headers)
+                assert response.status_code < 400, f"{path} returned {response.status_code}"
+
+        _, seconds, peak = measure(requests_batch, repeat=repeat)
+        record(name, FLASK_REQUESTS, seconds, peak)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the results next to the baseline and return the names of regressed benchmarks"""
+    regressions = []
+    print(f"{'benchmark':<46}{'time':>11}{'throughput':>14}{'peak':>10}{'vs baseline':>14}")
+    for name, result in results.items():
+        line = (f"{name:<46}{result['seconds'] * 1000:9.1f}ms{result['throughput']:>12,.0f}/s"
+                f"{result['peak_bytes'] / 1048576:8.1f}MB")
+        base = baseline.get(name)
+        if base:
+            time_ratio = result['seconds'] / base['seconds'] if base['seconds'] else 1
+            memory_ratio = result['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else 1
+            line += f"{(time_ratio - 1) * 100:+12.0f}%"
+            slower = time_ratio > 1 + tolerance and result['seconds'] - base['seconds'] > MIN_SLOWDOWN_SECONDS
+            if slower or memory_ratio > 1 + tolerance:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--articles', type=int, default=10000, help='articles in the scaled synthetic feeds')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='timed runs of each benchmark')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed slowdown, 0.5 = 50%% over baseline')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--record', action='store_true', help='download the configured feeds as fixtures first')
+    options = parser.parse_args()
+
+    if options.record:
+        print("recording fixtures:")
+        record_fixtures()
+
+    # Every file the pipeline writes goes to a scratch directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            results = run(options.articles, max(1, options.repeat))
+        finally:
+            os.chdir(cwd)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, options.tolerance)
+
+    if options.update_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline updated: {BASELINE_PATH}")
+    elif regressions:
+        print(f"{len(regressions)} benchmarks regressed more than {options.tolerance:.0%} against the baseline")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Feed fixtures for the WorldSummerize benchmarks
+Recorded or synthetic RSS documents and a local HTTP server that replays them
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from config import CATEGORIES, NEWS_SOURCES
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+FILLER = ('officials said on monday that talks between the two sides would continue after a '
+          'week of meetings while local reports described the situation as tense and analysts '
+          'warned that the outcome could shape the coming months for people across the region').split()
+
+
+def pseudo_words(count, seed=0):
+    """Return a deterministic vocabulary of made-up words standing in for names and places"""
+    rng = random.Random(seed)
+    syllables = ['ka', 'lo', 'mi', 'ra', 'ten', 'vor', 'ul', 'shi', 'ban', 'do', 'zer', 'pol', 'an', 'ez']
+    return [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+NAMES = pseudo_words(5000)
+
+
+def fixture_name(index):
+    """Return the file name of the recorded fixture of a configured feed"""
+    return f"feed_{index:02d}.xml"
+
+
+def record_fixtures(urls=None):
+    """Download every configured feed into the fixture directory"""
+    from fetcher import fetch_url
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for index, url in enumerate(urls or NEWS_SOURCES['rss_feeds']):
+        result = fetch_url(url)
+        if result['error']:
+            print(f"  skipped {url}: {result['error']}")
+            continue
+        with open(os.path.join(FIXTURE_DIR, fixture_name(index)), 'wb') as f:
+            f.write(result['content'])
+        print(f"  recorded {url} ({len(result['content'])} bytes)")
+
+
+def synthetic_feed(title, count, seed, start=0):
+    """Return a deterministic RSS 2.0 document with count news-like entries"""
+    rng = random.Random(seed)
+    terms = [term for weights in CATEGORIES.values() for term in weights]
+    now = time.time()
+    items = []
+    for i in range(start, start + count):
+        # Each story has its own keywords and named people and places, so
+        # stories differ the way real ones do and do not all look alike
+        keywords = rng.sample(terms, 3)
+        names = rng.sample(NAMES, 6)
+        headline = ' '.join(rng.choice(FILLER + names) for _ in range(6)) + ' ' + ' '.join(keywords)
+        sentences = []
+        for _ in range(rng.randint(2, 8)):
+            words = [rng.choice(FILLER) if rng.random() < 0.6 else rng.choice(names)
+                     for _ in range(rng.randint(10, 24))]
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+            sentences.append(' '.join(words).capitalize() + '.')
+        description = f"<p>{' '.join(sentences)}</p> <a href=\"https://example.com/{seed}/{i}\">Read more</a>"
+        items.append(
+            "<item>"
+            f"<title>{escape(headline.capitalize())}</title>"
+            f"<link>https://example.com/{seed}/{i}</link>"
+            f"<guid>https://example.com/{seed}/{i}</guid>"
+            f"<pubDate>{formatdate(now - i * 600)}</pubDate>"
+            f"<description>{escape(description)}</description>"
+            "</item>"
+        )
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(title)}</title><link>https://example.com/</link>"
+            f"<description>Benchmark fixture</description>{''.join(items)}</channel></rss>").encode('utf-8')
+
+
+def configured_feeds(entries_per_feed=20):
+    """Return a fixture for each configured feed, recorded if available and synthetic otherwise"""
+    feeds = {}
+    for index, url in enumerate(NEWS_SOURCES['rss_feeds']):
+        path = os.path.join(FIXTURE_DIR, fixture_name(index))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                feeds[f"/feed/{index}"] = f.read()
+        else:
+            feeds[f"/feed/{index}"] = synthetic_feed(f"Source {index}", entries_per_feed, seed=index)
+    return feeds
+
+
+def scaled_feeds(total_articles, entries_per_feed=100):
+    """Return synthetic feeds holding total_articles distinct entries between them"""
+    feeds = {}
+    for index in range(0, total_articles, entries_per_feed):
+        count = min(entries_per_feed, total_articles - index)
+        feeds[f"/scaled/{index // entries_per_feed}"] = synthetic_feed(
+            f"Scaled source {index // entries_per_feed}", count, seed=1000 + index, start=index)
+    return feeds
+
+
+class FixtureServer:
+    """Threaded local HTTP server replaying fixture documents by path"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = documents.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        """Return the local URL of a fixture path"""
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,132 @@
+"""
+Weighted keyword classifier for WorldSummerize
+Scores every article against every category in a single pass over its text
+"""
+
+import hashlib
+import json
+import string
+from collections import Counter
+
+from config import CATEGORIES, SETTINGS
+
+FALLBACK_CATEGORY = 'Other'
+
+# Every ASCII character other than letters, digits and & (for "s&p") separates
+# words, as do typographic quotes and dashes
+WORD_CHARACTERS = set(string.ascii_letters + string.digits + '&')
+SEPARATORS = {code: ' ' for code in range(128) if chr(code) not in WORD_CHARACTERS}
+SEPARATORS.update({ord(char): ' ' for char in '\u2018\u2019\u201c\u201d\u2013\u2014\u2026\u00a0'})
+
+
+def tokenize(text):
+    """Split text into lowercase words"""
+    return text.lower().translate(SEPARATORS).split()
+
+
+class WeightedClassifier:
+    """Multi-label classifier built once from a weighted term taxonomy"""
+
+    # Scoring is a sparse matrix product: each article is a row of term counts
+    # (the term-document matrix) multiplied by the term-by-category weight
+    # matrix, stored as one short list of (category, weight) pairs per term.
+    # The text is tokenized once and only its distinct words are looked up in
+    # the phrase table, so the cost per article depends on its length rather
+    # than on the number of categories or terms. Multi-word phrases are only
+    # tried at positions holding a word that starts one, and matching whole
+    # words keeps "ai" from matching "said" and "meta" from matching "metal".
+
+    def __init__(self, categories, title_weight=1, min_score=1):
+        self.categories = list(categories)
+        self.title_weight = title_weight
+        self.min_score = min_score
+        self.term_weights = []
+        self.words = {}
+        self.phrases = {}
+        self.phrase_starts = set()
+        self.max_words = 1
+
+        term_ids = {}
+        for index, category in enumerate(self.categories):
+            for term, weight in categories[category].items():
+                if term not in term_ids:
+                    term_ids[term] = len(self.term_weights)
+                    self.term_weights.append([])
+                    words = tokenize(term)
+                    table = self.phrases if len(words) > 1 else self.words
+                    # Accept simple plurals of the final word ("markets", "taxes")
+                    for suffix in ('', 's', 'es'):
+                        table.setdefault(' '.join(words[:-1] + [words[-1] + suffix]), term_ids[term])
+                    if len(words) > 1:
+                        self.phrase_starts.add(words[0])
+                        self.max_words = max(self.max_words, len(words))
+                self.term_weights[term_ids[term]].append((index, weight))
+
+    def term_counts(self, text, counts=None, weight=1):
+        """Add the weighted occurrence count of every known term in the text"""
+        counts = Counter() if counts is None else counts
+        tokens = tokenize(text)
+        words = self.words
+        for word, n in Counter(tokens).items():
+            term_id = words.get(word)
+            if term_id is not None:
+                counts[term_id] += n * weight
+        if not self.phrase_starts.isdisjoint(tokens):
+            phrases = self.phrases
+            starts = self.phrase_starts
+            for i, token in enumerate(tokens):
+                if token in starts:
+                    for size in range(2, self.max_words + 1):
+                        term_id = phrases.get(' '.join(tokens[i:i + size]))
+                        if term_id is not None:
+                            counts[term_id] += weight
+        return counts
+
+    def document_row(self, article):
+        """Return the sparse term-count row of an article with headline terms boosted"""
+        counts = self.term_counts(article['title'], weight=self.title_weight)
+        return self.term_counts(article.get('summary', ''), counts)
+
+    def score_rows(self, rows):
+        """Multiply sparse term-count rows by the term-category weight matrix"""
+        term_weights = self.term_weights
+        results = []
+        for row in rows:
+            scores = [0] * len(self.categories)
+            for term_id, count in row.items():
+                for index, weight in term_weights[term_id]:
+                    scores[index] += count * weight
+            results.append(scores)
+        return results
+
+    def classify_batch(self, articles):
+        """Return a scored multi-label result for each article"""
+        rows = [self.document_row(article) for article in articles]
+        results = []
+        for scores in self.score_rows(rows):
+            # Highest score first; the category order breaks ties
+            labels = sorted((index for index, score in enumerate(scores) if score >= self.min_score),
+                            key=lambda index: -scores[index])
+            results.append({
+                'category': self.categories[labels[0]] if labels else FALLBACK_CATEGORY,
+                'relevance': scores[labels[0]] if labels else 0,
+                'scores': {self.categories[index]: scores[index] for index in labels}
+            })
+        return results
+
+
+CLASSIFIER = WeightedClassifier(
+    CATEGORIES,
+    title_weight=SETTINGS.get('category_title_weight', 2),
+    min_score=SETTINGS.get('category_min_score', 1)
+)
+
+# Stored categories are reused only while the taxonomy and scoring settings are unchanged
+CLASSIFIER_VERSION = 'weighted-' + hashlib.sha1(json.dumps(
+    [CATEGORIES, CLASSIFIER.title_weight, CLASSIFIER.min_score], sort_keys=True
+).encode('utf-8')).hexdigest()[:12]
+
+
+def classify_batch(articles):
+    """Return the scored multi-label classification of each article in order"""
+    return CLASSIFIER.classify_batch(articles)
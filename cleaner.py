@@ -0,0 +1,75 @@
+"""
+HTML cleaner for WorldSummerize
+Strips feed markup to single-spaced plain text in batches, on worker processes for large ingests
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import lxml.etree
+import lxml.html
+
+from config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Part of the article identity in the store, so text cleaned by an older
+# cleaner is cleaned again rather than reused
+CLEANER_VERSION = 'lxml-1'
+
+# Elements whose content is never article text
+DROP_TAGS = ('script', 'style', 'noscript', 'iframe', 'object', 'embed', 'form', 'button', 'select', 'template')
+
+# Elements that end a word: text on either side of them is separate
+BLOCK_TAGS = frozenset(('address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption',
+                        'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'img', 'li',
+                        'main', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul'))
+
+_parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+
+
+def clean_text(text):
+    """Return the plain text of an HTML fragment with entities decoded and whitespace collapsed"""
+    if not text:
+        return ''
+    # Most titles and many blurbs are already plain text
+    if '<' not in text and '&' not in text:
+        return ' '.join(text.split())
+
+    try:
+        fragment = lxml.html.fragment_fromstring(text, create_parent='div', parser=_parser)
+    except (lxml.etree.ParserError, ValueError):
+        return ' '.join(text.split())
+
+    lxml.etree.strip_elements(fragment, *DROP_TAGS, with_tail=False)
+    for element in fragment.iter(*BLOCK_TAGS):
+        element.text = ' ' + element.text if element.text else ' '
+        element.tail = ' ' + element.tail if element.tail else ' '
+    return ' '.join(fragment.text_content().split())
+
+
+def clean_texts(texts):
+    """Clean a list of HTML fragments"""
+    return [clean_text(text) for text in texts]
+
+
+def clean_workers():
+    """Return the number of worker processes large batches are spread over"""
+    workers = SETTINGS.get('clean_workers', 0)
+    return workers or os.cpu_count() or 1
+
+
+def clean_batch(texts):
+    """Clean a list of HTML fragments, on worker processes when the batch is large"""
+    workers = clean_workers()
+    if workers == 1 or len(texts) < SETTINGS.get('clean_pool_threshold', 2000):
+        return clean_texts(texts)
+
+    # Chunks keep the pickling overhead per worker round trip small
+    chunk_size = SETTINGS.get('clean_chunk_size', 500)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        cleaned = [text for chunk in executor.map(clean_texts, chunks) for text in chunk]
+    logger.info(f"Cleaned {len(texts)} fragments on {min(workers, len(chunks))} worker processes")
+    return cleaned
@@ -0,0 +1,176 @@
+"""
+Near-duplicate story clustering for WorldSummerize
+Groups articles about the same story using MinHash signatures and an LSH index
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import time
+import zlib
+from array import array
+
+from config import SETTINGS
+from categorizer import tokenize
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 2^61 - 1, a Mersenne prime larger than any 32-bit shingle hash
+PRIME = (1 << 61) - 1
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Title the pipeline gives feed entries that have none
+PLACEHOLDER_TITLE = 'No title'
+
+# Fixed seed so signatures stay comparable across runs
+_rng = random.Random(20250717)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS story_signatures (
+    article_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    cluster_id TEXT NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS story_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    article_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_story_buckets ON story_buckets (band, bucket);
+CREATE INDEX IF NOT EXISTS idx_story_buckets_article ON story_buckets (article_id);
+"""
+
+
+def shingles(text, size=2, max_words=80):
+    """Return the hashed word shingles of a text; texts shorter than one shingle have none"""
+    words = tokenize(text)[:max_words]
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+
+def minhash(text):
+    """Return the MinHash signature of a text, or None if it is too short to compare"""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    return [min((a * x + b) % PRIME for x in hashes) for a, b in PERMUTATIONS]
+
+
+def band_buckets(signature):
+    """Return the LSH bucket of each band of a signature"""
+    return [zlib.crc32(array('Q', signature[band * ROWS:(band + 1) * ROWS]).tobytes())
+            for band in range(BANDS)]
+
+
+def similarity(first, second):
+    """Estimate the Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def story_text(article):
+    """Return the text a story signature is built from"""
+    # The placeholder of entries without a title says nothing about the story
+    title = '' if article['title'] == PLACEHOLDER_TITLE else article['title']
+    return f"{title} {article.get('summary', '')}"
+
+
+class StoryIndex:
+    """Persistent LSH index assigning each article to a story cluster"""
+
+    # Candidates come from matching LSH buckets and are confirmed by signature
+    # similarity, so the work per new article is a handful of indexed lookups
+    # instead of a comparison against every stored article. Articles keep the
+    # cluster they were assigned when first seen, so a story keeps the same
+    # cluster id across runs.
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('article_store_path', 'cache/articles.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.threshold = SETTINGS.get('near_duplicate_threshold', 0.5)
+
+    def _known(self, articles):
+        known = {}
+        ids = [article['id'] for article in articles]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for article_id, hash_value, cluster_id in self.conn.execute(
+                    f"SELECT article_id, content_hash, cluster_id FROM story_signatures "
+                    f"WHERE article_id IN ({placeholders})", chunk):
+                known[article_id] = (hash_value, cluster_id)
+        return known
+
+    def _best_match(self, signature, buckets):
+        candidates = set()
+        for band, bucket in enumerate(buckets):
+            for (article_id,) in self.conn.execute(
+                    "SELECT article_id FROM story_buckets WHERE band = ? AND bucket = ?", (band, bucket)):
+                candidates.add(article_id)
+
+        best_cluster, best_score = None, self.threshold
+        for article_id in candidates:
+            row = self.conn.execute("SELECT signature, cluster_id FROM story_signatures WHERE article_id = ?",
+                                    (article_id,)).fetchone()
+            if row is None:
+                continue
+            score = similarity(signature, array('Q', row[0]))
+            if score >= best_score:
+                best_cluster, best_score = row[1], score
+        return best_cluster
+
+    @REGISTRY.timed('stage_seconds', stage='cluster')
+    def assign(self, articles):
+        """Set article['cluster_id'] on every article, indexing new ones"""
+        known = self._known(articles)
+        now = time.time()
+        with self.conn:
+            for article in articles:
+                stored = known.get(article['id'])
+                if stored is not None and stored[0] == article['content_hash']:
+                    article['cluster_id'] = stored[1]
+                    continue
+
+                signature = minhash(story_text(article))
+                self.conn.execute("DELETE FROM story_buckets WHERE article_id = ?", (article['id'],))
+                if signature is None:
+                    # Too little text to tell stories apart: the article is a story of its own
+                    article['cluster_id'] = article['id']
+                    self.conn.execute("DELETE FROM story_signatures WHERE article_id = ?", (article['id'],))
+                    continue
+                buckets = band_buckets(signature)
+                article['cluster_id'] = self._best_match(signature, buckets) or article['id']
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO story_signatures VALUES (?, ?, ?, ?, ?)",
+                    (article['id'], article['content_hash'], array('Q', signature).tobytes(),
+                     article['cluster_id'], now))
+                self.conn.executemany("INSERT INTO story_buckets VALUES (?, ?, ?)",
+                                      [(band, bucket, article['id']) for band, bucket in enumerate(buckets)])
+
+            self.conn.executemany("UPDATE story_signatures SET last_seen = ? WHERE article_id = ?",
+                                  [(now, article['id']) for article in articles])
+
+    def prune(self, max_age_days=None):
+        """Drop stories not seen recently so the index stays bounded"""
+        max_age_days = max_age_days or SETTINGS.get('near_duplicate_window_days', 3)
+        cutoff = time.time() - max_age_days * 86400
+        with self.conn:
+            self.conn.execute("DELETE FROM story_buckets WHERE article_id IN "
+                              "(SELECT article_id FROM story_signatures WHERE last_seen < ?)", (cutoff,))
+            self.conn.execute("DELETE FROM story_signatures WHERE last_seen < ?", (cutoff,))
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
@@ -35,17 +35,131 @@ NEWS_SOURCES = {
     ]
 }
 
+# Category taxonomy with per-term weights. An article scores the sum of the
+# weights of every term it mentions (title mentions count extra) and is filed
+# under its highest-scoring category. The order below is the section order in
+# the PDF and breaks ties between equal scores.
+CATEGORIES = {
+    'World News': {
+        'world': 1, 'international': 2, 'global': 1, 'nation': 1, 'country': 1,
+        'conflict': 2, 'war': 3, 'peace': 2, 'refugee': 3, 'crisis': 2, 'humanitarian': 3,
+        'united nations': 3, 'nato': 3, 'military': 2, 'defense': 2, 'security': 1
+    },
+    'Business & Economy': {
+        'economy': 3, 'market': 2, 'business': 2, 'finance': 2, 'stock': 2, 'trade': 2,
+        'inflation': 3, 'recession': 3, 'gdp': 3, 'investment': 2, 'bank': 2, 'currency': 2,
+        'corporate': 2, 'earnings': 3, 'revenue': 2, 'profit': 2, 'merger': 3, 'acquisition': 2,
+        'startup': 1, 'ipo': 3, 'crypto': 2, 'bitcoin': 2, 'dow': 2, 'nasdaq': 3, 's&p': 3
+    },
+    'Technology': {
+        'technology': 3, 'tech': 2, 'ai': 3, 'artificial intelligence': 3, 'software': 3, 'cyber': 2,
+        'digital': 1, 'internet': 2, 'data': 1, 'hack': 2, 'startup': 1, 'silicon valley': 3,
+        'algorithm': 2, 'machine learning': 3, 'robotics': 3, 'automation': 2, 'cloud': 1,
+        'google': 2, 'microsoft': 2, 'apple': 1, 'amazon': 1, 'meta': 2, 'nvidia': 3
+    },
+    'Politics': {
+        'politics': 3, 'election': 3, 'government': 2, 'minister': 2, 'president': 2,
+        'congress': 3, 'senate': 3, 'parliament': 3, 'democrat': 3, 'republican': 3,
+        'policy': 1, 'legislation': 3, 'vote': 2, 'campaign': 2, 'candidate': 2,
+        'diplomatic': 2, 'embassy': 2, 'sanctions': 2, 'treaty': 2, 'summit': 2
+    },
+    'Science & Health': {
+        'science': 3, 'research': 2, 'study': 1, 'health': 2, 'medical': 3, 'disease': 3,
+        'vaccine': 3, 'drug': 2, 'treatment': 2, 'hospital': 2, 'doctor': 2, 'patient': 2,
+        'discovery': 2, 'breakthrough': 2, 'scientist': 3, 'laboratory': 3, 'clinical': 3,
+        'mental health': 3, 'pandemic': 3, 'virus': 3, 'bacteria': 3, 'dna': 3
+    },
+    'Climate & Environment': {
+        'climate': 3, 'environment': 3, 'weather': 2, 'storm': 2, 'hurricane': 3, 'flood': 2,
+        'drought': 3, 'wildfire': 3, 'temperature': 2, 'global warming': 3, 'carbon': 3,
+        'renewable': 3, 'solar': 2, 'wind': 1, 'energy': 1, 'sustainability': 3, 'pollution': 3,
+        'conservation': 2, 'biodiversity': 3, 'ocean': 1, 'forest': 1, 'arctic': 2
+    }
+}
+
 # Application settings
 SETTINGS = {
-    'update_interval_hours': 1,
+    'update_interval_hours': 1,  # Longest an edition waits to include new stories
+    'feed_poll_check_seconds': 60,  # How often the scheduler looks for feeds due a poll
+    'feed_poll_min_minutes': 5,  # Shortest interval between polls of one feed
+    'feed_poll_max_minutes': 180,  # Longest interval, also the cap for failing feeds
+    'feed_poll_factor': 0.5,  # Share of a feed's learned gap between stories to wait between polls
+    'feed_poll_jitter': 0.1,  # Random spread of each poll time, as a fraction of the interval
+    'feed_rate_smoothing': 0.3,  # Weight of the latest poll in a feed's learned publishing gap
+    'publish_min_new_articles': 5,  # New stories that trigger a new edition straight away
+    'feed_health_window': 20,  # Recent polls a source's error and bozo rates are measured over
+    'feed_latency_smoothing': 0.3,  # Weight of the latest download in a source's average latency
+    'breaker_failures': 3,  # Failed polls in a row that take a source out of rotation
+    'breaker_open_minutes': 30,  # First pause of a failing source, doubled each time it trips again
+    'breaker_max_open_hours': 24,  # Longest pause before a failing source is probed again
+    'feed_probe_timeout_seconds': 3,  # Time a probe of a failing source may take
+    'leader_lock_path': 'cache/generator.lock',  # Held by the one scheduler that generates editions
+    'job_queue_path': 'cache/jobs.db',  # Queued and past generation runs
+    'job_poll_seconds': 5,  # How often the generator checks for queued runs
+    'refresh_token': None,  # Bearer token /api/refresh requires (or WORLDSUMMARIZE_REFRESH_TOKEN); None disables it
+    'refresh_min_interval_seconds': 600,  # Shortest time between runs requested through /api/refresh
     'max_articles_per_source': 10,  # Increased to get more content
+    'max_articles_per_category': 10,  # Stories shown in each PDF section
     'summary_length': 400,  # Much longer summaries
     'pdf_output_path': 'world_summary.pdf',
+    'html_output_path': 'world_summary.html',  # Lightweight page for browsers
+    'json_output_path': 'world_summary.json',  # Headline feed for the web UI and API clients
+    'render_cache_size': 8,  # Rendered editions kept in memory
+    'render_cache_bytes': 16 * 1024 * 1024,  # Memory the rendered editions may use together
+    'custom_edition_pool_size': 40,  # Stories of each category kept for custom editions
+    'custom_edition_cache_size': 64,  # Rendered custom editions kept in memory
+    'custom_edition_cache_bytes': 32 * 1024 * 1024,  # Memory the custom editions may use together
+    'asset_cache_bytes': 32 * 1024 * 1024,  # Published files the web app keeps in memory
+    'event_poll_seconds': 5,  # How often the web app checks for a new edition
+    'event_keepalive_seconds': 25,  # Comment sent on idle event streams to keep proxies from closing them
     'archive_path': 'archive/',
+    'archive_catalog_path': 'archive/catalog.json',  # Manifest of archived editions
+    'edition_store_path': 'archive/editions.db',  # Compact documents of archived editions
+    'archive_hourly_days': 2,  # Every edition is kept this long
+    'archive_daily_days': 30,  # Then the last edition of each day, up to this age
+    'archive_weekly_weeks': 52,  # Then the last edition of each week, up to this age (0 = forever)
+    'archive_keep_files': 2,  # Archived editions that keep their files; older ones are rendered on request
+    'current_edition_path': 'cache/current.json',  # Pointer to the files of the live edition
+    'cache_dir': 'cache/',  # Feed cache and other run-to-run state
+    'article_store_path': 'cache/articles.db',  # Processed articles from earlier runs
+    'search_index_path': 'cache/search.db',  # Full-text index of every published article
     'enable_logging': True,
     'log_file': 'worldsummerize.log',
     'target_word_count': 2000,  # Target word count for the document
-    'max_pages': 12  # Allow many more pages for 10 articles × 200 words each
+    'max_pages': 12,  # Allow many more pages for 10 articles × 200 words each
+    'category_title_weight': 2,  # Multiplier for terms found in the headline
+    'category_min_score': 1,  # Lowest score that counts as a category match
+    'near_duplicate_threshold': 0.5,  # Estimated Jaccard similarity of the same story
+    'near_duplicate_window_days': 3,  # How long stories stay in the duplicate index
+    'summary_mode': 'lead',  # 'lead' (opening sentences) or 'extractive' (TF-IDF ranked sentences)
+    'fetch_article_bodies': True,  # Summarize from the article page when the feed blurb is thin
+    'summary_pool_threshold': 1000,  # Batches at least this large use worker processes
+    'summary_workers': 0,  # Worker processes for large batches (0 = one per CPU, 1 = never)
+    'summary_cache_size': 5000,  # Summaries kept in memory between runs
+    'clean_batch_size': 2000,  # Articles cleaned together when worker processes are available
+    'clean_pool_threshold': 2000,  # Cleaning batches at least this large use worker processes
+    'clean_chunk_size': 500,  # Titles and summaries sent to a worker at a time
+    'clean_workers': 0,  # Worker processes for HTML cleaning (0 = one per CPU, 1 = never)
+
+    # Feed fetching
+    'fetch_workers': 16,  # Concurrent downloads
+    'fetch_timeout_seconds': 10,  # Hard limit for a single feed
+    'fetch_deadline_seconds': 30,  # Budget for starting downloads; feeds not started by then are skipped
+    'fetch_max_bytes': 5 * 1024 * 1024,  # Largest feed body accepted
+    'fetch_pool_hosts': 64,  # Hosts kept in the connection pool
+    'fetch_pool_per_host': 4,  # Keep-alive connections per host
+    'user_agent': 'WorldSummarize/1.0 (+https://github.com/Harry166/worldsummarizer)',
+
+    # Article enrichment: pages behind thin blurbs, crawled from the feeds' own sites and news_websites
+    'enrichment_workers': 8,  # Concurrent page downloads
+    'enrichment_per_site': 2,  # Concurrent downloads from any one site
+    'enrichment_deadline_seconds': 20,  # Budget for crawling the pages of one run
+    'enrichment_max_bytes': 2 * 1024 * 1024,  # Largest article page accepted
+    'enrichment_cache_dir': 'cache/pages/',  # Main text of crawled pages with their validators
+    'enrichment_revalidate_hours': 24,  # Age at which a cached page is revalidated with its ETag
+    'enrichment_retry_hours': 6,  # Pages that failed are not tried again sooner than this
+    'enrichment_cache_days': 7,  # Pages not seen for this long are deleted
+    'robots_cache_hours': 24  # How long a site's robots.txt is trusted
 }
 
 # PDF settings
@@ -58,5 +172,6 @@ PDF_SETTINGS = {
     'title_font_size': 24,
     'heading_font_size': 14,
     'body_font_size': 10,
-    'line_spacing': 12  # Tighter line spacing
+    'line_spacing': 12,  # Tighter line spacing
+    'max_article_lines': 8  # Longer summaries end with an ellipsis
 }
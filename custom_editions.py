@@ -0,0 +1,180 @@
+"""
+Custom editions for WorldSummerize
+Builds editions limited to chosen categories, sources and length from the latest run's stories
+"""
+
+import hashlib
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from config import CATEGORIES, SETTINGS
+from assets import content_etag
+from categorizer import FALLBACK_CATEGORY
+from document import DOCUMENT_VERSION, SUBTITLE, TITLE
+from metrics import REGISTRY
+from renderers import RENDERERS, render_document
+
+logger = logging.getLogger(__name__)
+
+
+def split_param(value):
+    """Return the non-empty comma-separated values of a query parameter"""
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def normalize_params(categories=None, sources=None, pages=None, output_format='pdf'):
+    """Return the canonical form of custom edition parameters, raising ValueError for invalid ones"""
+    # Equivalent requests normalize to the same key: categories in section
+    # order, sources lowercased and sorted, pages within the configured range
+    known = {category.lower(): category for category in list(CATEGORIES) + [FALLBACK_CATEGORY]}
+    chosen = set()
+    for name in split_param(categories):
+        if name.lower() not in known:
+            raise ValueError(f"Unknown category '{name}', expected one of: {', '.join(known.values())}")
+        chosen.add(known[name.lower()])
+    categories = tuple(category for category in known.values() if category in chosen)
+
+    sources = tuple(sorted({source.lower() for source in split_param(sources)}))
+
+    max_pages = SETTINGS.get('max_pages', 4)
+    if pages in (None, ''):
+        pages = max_pages
+    try:
+        pages = int(pages)
+    except (TypeError, ValueError):
+        raise ValueError(f"pages must be a whole number from 1 to {max_pages}")
+    if not 1 <= pages <= max_pages:
+        raise ValueError(f"pages must be a whole number from 1 to {max_pages}")
+
+    if output_format not in RENDERERS:
+        raise ValueError(f"Unknown format '{output_format}', expected one of: {', '.join(RENDERERS)}")
+    return categories, sources, pages, output_format
+
+
+def load_pool(pointer):
+    """Return the candidate stories of an edition as document entries with their category"""
+    try:
+        with open(pointer['articles'], 'r', encoding='utf-8') as f:
+            return json.load(f)['articles']
+    except (KeyError, OSError, ValueError):
+        # Editions published before the pool was kept offer just their own stories
+        with open(pointer['files']['json']['path'], 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        return [dict(entry, category=section['category'])
+                for section in document['sections'] for entry in section['articles']]
+
+
+def build_custom_document(pointer, pool, categories, sources, pages):
+    """Return the document of a custom edition, or None when no story matches"""
+    per_category = SETTINGS.get('max_articles_per_category', 10)
+    all_categories = list(CATEGORIES) + [FALLBACK_CATEGORY]
+    # Fewer sections get more stories each, so a one-category edition still fills its pages
+    limit = math.ceil(per_category * len(all_categories) / len(categories or all_categories))
+
+    sections = {}
+    for entry in pool:
+        if categories and entry['category'] not in categories:
+            continue
+        # Sources match by name fragment, so "bbc" finds "BBC News - World"
+        if sources and not any(source in (entry.get('source') or '').lower() for source in sources):
+            continue
+        articles = sections.setdefault(entry['category'], [])
+        if len(articles) < limit:
+            articles.append({key: value for key, value in entry.items() if key != 'category'})
+    if not sections:
+        return None
+
+    described = list(categories) + [f"from {', '.join(sources)}"] if sources else list(categories)
+    key = hashlib.sha1(json.dumps([categories, sources, pages]).encode('utf-8')).hexdigest()[:12]
+    return {
+        'version': DOCUMENT_VERSION,
+        'id': f"{pointer['id']}_custom_{key}",
+        'title': TITLE,
+        'subtitle': f"{SUBTITLE}: {'; '.join(described)}" if described else SUBTITLE,
+        'generated_at': pointer['generated_at'],
+        'max_pages': pages,
+        'sections': [{'category': category, 'articles': sections[category]}
+                     for category in all_categories if category in sections]
+    }
+
+
+class CustomEditions:
+    """LRU cache of rendered custom editions that renders each distinct request once"""
+
+    # Entries are keyed by the edition id and the normalized parameters, so a
+    # new edition never serves stale output. Requests for a key that is being
+    # rendered wait for that render instead of starting their own.
+
+    def __init__(self, current_edition, max_entries=None, max_bytes=None):
+        self.current_edition = current_edition
+        self.max_entries = max_entries or SETTINGS.get('custom_edition_cache_size', 64)
+        self.max_bytes = max_bytes or SETTINGS.get('custom_edition_cache_bytes', 32 * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.pending = {}
+        self.pool = None
+        self.pool_id = None
+
+    def _load_pool(self, pointer):
+        with self.lock:
+            if self.pool_id == pointer['id']:
+                return self.pool
+        pool = load_pool(pointer)
+        with self.lock:
+            self.pool, self.pool_id = pool, pointer['id']
+            # Output of earlier editions will not be asked for again
+            for key in [key for key in self.cache if key[0] != pointer['id']]:
+                self.cache_bytes -= len(self.cache.pop(key)[0])
+        return pool
+
+    def _store(self, key, output):
+        with self.lock:
+            self.cache[key] = output
+            self.cache_bytes += len(output[0])
+            while len(self.cache) > 1 and (len(self.cache) > self.max_entries or self.cache_bytes > self.max_bytes):
+                self.cache_bytes -= len(self.cache.popitem(last=False)[1][0])
+
+    def get(self, categories=None, sources=None, pages=None, output_format='pdf'):
+        """Return (bytes, etag) of a custom edition of the current edition, or None when nothing matches"""
+        pointer = self.current_edition.get()
+        if pointer is None:
+            return None
+        params = normalize_params(categories, sources, pages, output_format)
+        key = (pointer['id'],) + params
+
+        with self.lock:
+            output = self.cache.get(key)
+            if output is not None:
+                self.cache.move_to_end(key)
+                REGISTRY.inc('custom_edition_requests_total', outcome='hit')
+                return output
+            future = self.pending.get(key)
+            leader = future is None
+            if leader:
+                future = self.pending[key] = Future()
+        if not leader:
+            REGISTRY.inc('custom_edition_requests_total', outcome='coalesced')
+            return future.result()
+
+        try:
+            document = build_custom_document(pointer, self._load_pool(pointer), *params[:3])
+            output = None
+            if document is not None:
+                data = render_document(document, params[3])
+                output = (data, content_etag(data))
+                self._store(key, output)
+                logger.info(f"Rendered custom edition {document['id']} as {params[3]} ({len(data)} bytes)")
+            REGISTRY.inc('custom_edition_requests_total', outcome='rendered')
+            future.set_result(output)
+            return output
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.pending[key]
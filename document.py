@@ -0,0 +1,82 @@
+"""
+Edition document model for WorldSummerize
+Describes one edition independently of its output format, built once per run
+"""
+
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from config import SETTINGS
+from summarizer import build_summary
+
+DOCUMENT_VERSION = 1
+TITLE = "WORLD SUMMARIZE"
+SUBTITLE = "Global News Summary"
+
+
+def published_iso(published):
+    """Return a feed timestamp (UTC struct_time or list) as an ISO 8601 string"""
+    if not published:
+        return None
+    try:
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', tuple(published))
+    except (TypeError, ValueError):
+        return None
+
+
+def safe_link(link):
+    """Return a feed link if it is an http(s) URL, otherwise an empty string"""
+    # Links come from third-party feeds and end up in href attributes, so
+    # javascript: and other schemes are dropped
+    link = (link or '').strip()
+    try:
+        return link if urlparse(link).scheme in ('http', 'https') else ''
+    except ValueError:
+        return ''
+
+
+def article_entry(article):
+    """Return the document entry of one article"""
+    source = article.get('source', 'Unknown')
+    return {
+        'id': article.get('id'),
+        'title': article['title'],
+        # Natural summary between 150-300 words, normally built ahead of rendering
+        'summary': article.get('digest') or build_summary(article.get('summary', ''), source),
+        'source': source,
+        'link': safe_link(article.get('link')),
+        'published': published_iso(article.get('published')),
+        'also_reported_by': list(article.get('also_reported_by') or [])
+    }
+
+
+def build_document(categorized_articles, generated_at=None):
+    """Build the edition document from the categorized articles"""
+    generated_at = generated_at or datetime.now()
+    per_category = SETTINGS.get('max_articles_per_category', 10)
+
+    sections = []
+    for category, articles in categorized_articles.items():
+        if articles:
+            sections.append({
+                'category': category,
+                'articles': [article_entry(article) for article in articles[:per_category]]
+            })
+
+    return {
+        'version': DOCUMENT_VERSION,
+        'id': generated_at.strftime('%Y%m%d_%H%M%S'),
+        'title': TITLE,
+        'subtitle': SUBTITLE,
+        'generated_at': generated_at.isoformat(timespec='seconds'),
+        'sections': sections
+    }
+
+
+def display_summary(entry):
+    """Return an article's summary with the other outlets that covered the story"""
+    summary = entry['summary']
+    if entry.get('also_reported_by'):
+        summary += f" Also reported by {', '.join(entry['also_reported_by'])}."
+    return summary
@@ -0,0 +1,336 @@
+"""
+Article enrichment for WorldSummerize
+Crawls the pages behind thin feed blurbs politely and keeps their main text on disk
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import lxml.etree
+import lxml.html
+
+from config import NEWS_SOURCES, SETTINGS
+from feed_cache import write_json_atomic
+from fetcher import fetch_url
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Elements that never hold the story itself
+BOILERPLATE_TAGS = ('script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'figure',
+                    'iframe', 'svg', 'button', 'select', 'template')
+
+# Class and id hints of story containers and of page furniture, as in Readability
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|post|story|text', re.I)
+NEGATIVE_HINTS = re.compile(r'comment|footer|sidebar|related|promo|share|social|nav|menu|newsletter|subscribe|'
+                            r'advert|sponsor|cookie|banner|byline|caption|breadcrumb|popup|modal', re.I)
+
+# Paragraphs shorter than this are captions, bylines and buttons
+MIN_PARAGRAPH_WORDS = 8
+
+_robots = {}
+_robots_lock = threading.Lock()
+_host_locks = {}
+_next_fetch = {}
+
+
+def site_key(url):
+    """Return the registrable part of a URL's host, e.g. bbc.co.uk for feeds.bbc.co.uk"""
+    labels = (urlparse(url).hostname or '').split('.')
+    # Country domains with a second-level label, such as .co.uk or .com.au
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in ('co', 'com', 'org', 'net', 'ac', 'gov'):
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def crawl_sites():
+    """Return the sites article pages may be crawled from: the configured feeds' and news websites'"""
+    return {site_key(url) for url in NEWS_SOURCES['rss_feeds'] + NEWS_SOURCES.get('news_websites', [])}
+
+
+def _link_density(element, text_length):
+    link_length = sum(len(link.text_content()) for link in element.iter('a'))
+    return link_length / text_length if text_length else 1
+
+
+def extract_main_text(html):
+    """Return the story text of an article page, found by scoring the containers of its paragraphs"""
+    try:
+        document = lxml.html.fromstring(html)
+    except (lxml.etree.ParserError, ValueError):
+        return ''
+    lxml.etree.strip_elements(document, *BOILERPLATE_TAGS, with_tail=False)
+
+    # Every substantial paragraph scores its parent fully and its grandparent
+    # by half, more for longer and comma-rich paragraphs
+    scores = {}
+    for paragraph in document.iter('p'):
+        words = len(paragraph.text_content().split())
+        parent = paragraph.getparent()
+        if words < MIN_PARAGRAPH_WORDS or parent is None:
+            continue
+        score = 1 + paragraph.text_content().count(',') + min(words // 20, 3)
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    if not scores:
+        return ''
+
+    def weighted(element):
+        score = scores[element]
+        hints = f"{element.get('class', '')} {element.get('id', '')}"
+        if POSITIVE_HINTS.search(hints):
+            score += 25
+        if NEGATIVE_HINTS.search(hints):
+            score -= 25
+        # Link lists and navigation score little however long they are
+        return score * (1 - _link_density(element, len(element.text_content())))
+
+    container = max(scores, key=weighted)
+    paragraphs = []
+    for paragraph in container.iter('p'):
+        text = ' '.join(paragraph.text_content().split())
+        if text.count(' ') + 1 >= MIN_PARAGRAPH_WORDS and _link_density(paragraph, len(text)) < 0.5:
+            paragraphs.append(text)
+    return ' '.join(paragraphs)
+
+
+def robots_parser(url, deadline=None):
+    """Return the cached robots.txt rules of a URL's host, downloading them when missing or stale"""
+    parsed = urlparse(url)
+    host = f"{parsed.scheme}://{parsed.netloc}"
+    with _robots_lock:
+        lock = _host_locks.setdefault(host, threading.Lock())
+
+    # One download per host even when several of its pages are queued at once
+    with lock:
+        cached = _robots.get(host)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+
+        parser = RobotFileParser(f"{host}/robots.txt")
+        result = fetch_url(f"{host}/robots.txt", deadline, metric='page_fetch')
+        ttl = SETTINGS.get('robots_cache_hours', 24) * 3600
+        if result['status'] in (401, 403):
+            parser.disallow_all = True
+        elif result['status'] is None or result['status'] >= 500:
+            # The site is struggling; stay away and ask again within the hour
+            parser.disallow_all = True
+            ttl = min(ttl, 3600)
+        elif result['status'] >= 400 or not result['content']:
+            parser.allow_all = True
+        else:
+            parser.parse(result['content'].decode('utf-8', errors='replace').splitlines())
+        # Marks the rules as loaded, without which crawl_delay() reports nothing
+        parser.modified()
+        _robots[host] = (parser, time.time() + ttl)
+        return parser
+
+
+def _wait_turn(url, delay, deadline):
+    """Sleep until a host's crawl delay since the previous request has passed; False past the deadline"""
+    host = urlparse(url).netloc
+    with _robots_lock:
+        now = time.monotonic()
+        start = max(now, _next_fetch.get(host, 0))
+        if start > deadline:
+            return False
+        _next_fetch[host] = start + delay
+    time.sleep(start - now)
+    return True
+
+
+def fetch_page(url, deadline, headers=None):
+    """Download an article page if robots.txt allows it and return a fetch result dict"""
+    user_agent = SETTINGS.get('user_agent', 'WorldSummarize/1.0')
+    parser = robots_parser(url, deadline)
+    refused = None
+    if not parser.can_fetch(user_agent, url):
+        refused = 'disallowed by robots.txt'
+    else:
+        delay = parser.crawl_delay(user_agent)
+        if delay and not _wait_turn(url, float(delay), deadline):
+            refused = 'crawl delay exceeds the deadline'
+    if refused:
+        return {'url': url, 'status': None, 'content': None, 'headers': {}, 'elapsed': 0.0, 'error': refused}
+    return fetch_url(url, deadline, headers, max_bytes=SETTINGS.get('enrichment_max_bytes', 2 * 1024 * 1024),
+                     metric='page_fetch')
+
+
+def crawl_pages(urls, request_headers=None):
+    """Download article pages concurrently with a per-site limit, yielding fetch results as they complete"""
+    request_headers = request_headers or {}
+    deadline = time.monotonic() + SETTINGS.get('enrichment_deadline_seconds', 20)
+    per_site = SETTINGS.get('enrichment_per_site', 2)
+
+    # One queue per site; a page is started only while its site has a free slot
+    queues = {}
+    for url in urls:
+        queues.setdefault(site_key(url), deque()).append(url)
+    active = {site: 0 for site in queues}
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=SETTINGS.get('enrichment_workers', 8),
+                            thread_name_prefix='crawl') as executor:
+        def dispatch():
+            for site, queue in queues.items():
+                while queue and active[site] < per_site:
+                    url = queue.popleft()
+                    active[site] += 1
+                    in_flight[executor.submit(fetch_page, url, deadline, request_headers.get(url))] = site
+
+        dispatch()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                active[in_flight.pop(future)] -= 1
+                yield future.result()
+            dispatch()
+
+
+class PageCache:
+    """On-disk cache of crawled article text, one JSON file per URL holding its validators"""
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('enrichment_cache_dir', 'cache/pages/')
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        """Return the cached entry of a URL, or None"""
+        try:
+            with open(self._file(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, body, headers=None, error=None):
+        """Store the main text of a page together with its ETag and Last-Modified"""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        entry = {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'body': body,
+            'error': error,
+            'fetched_at': time.time()
+        }
+        write_json_atomic(self._file(url), entry)
+        return entry
+
+    def put_not_modified(self, entry, headers=None):
+        """Renew a cached page after a 304, keeping stored validators the response leaves out"""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        entry = dict(entry, etag=headers.get('etag') or entry.get('etag'),
+                     last_modified=headers.get('last-modified') or entry.get('last_modified'),
+                     error=None, fetched_at=time.time())
+        write_json_atomic(self._file(entry['url']), entry)
+        return entry
+
+    def put_error(self, entry, error):
+        """Note a failed revalidation of a cached page, keeping its text and validators"""
+        entry = dict(entry, error=error, fetched_at=time.time())
+        write_json_atomic(self._file(entry['url']), entry)
+        return entry
+
+    def is_fresh(self, entry):
+        """Return whether a cached entry can be used without asking the site again"""
+        age = time.time() - entry['fetched_at']
+        if entry.get('error'):
+            return age < SETTINGS.get('enrichment_retry_hours', 6) * 3600
+        return age < SETTINGS.get('enrichment_revalidate_hours', 24) * 3600
+
+    def prune(self):
+        """Delete pages not fetched or revalidated within the retention period"""
+        cutoff = time.time() - SETTINGS.get('enrichment_cache_days', 7) * 86400
+        removed = 0
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+def conditional_headers(entry):
+    """Return the revalidation headers of a cached page"""
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def enrich_articles(articles):
+    """Set article['body'] to the main text of the linked page where it says more than the blurb"""
+    cache = PageCache()
+    sites = crawl_sites()
+    by_link = {}
+    for article in articles:
+        link = article.get('link')
+        if link and link.startswith(('http://', 'https://')) and site_key(link) in sites:
+            by_link.setdefault(link, []).append(article)
+
+    # Each page is crawled once; later runs read it from disk and only
+    # revalidate it with its ETag once it is old
+    bodies = {}
+    request_headers = {}
+    stale = {}
+    for link in by_link:
+        entry = cache.get(link)
+        if entry is not None and cache.is_fresh(entry):
+            bodies[link] = entry['body']
+            REGISTRY.inc('enrichment_pages_total', outcome='cached')
+        elif entry is not None and entry.get('body'):
+            request_headers[link] = conditional_headers(entry)
+            bodies[link] = entry['body']
+            stale[link] = entry
+
+    fetched = 0
+    for result in crawl_pages([link for link in by_link if link not in bodies or link in request_headers],
+                              request_headers):
+        link = result['url']
+        if result['status'] == 304:
+            cache.put_not_modified(stale[link], result['headers'])
+            outcome = 'not_modified'
+        elif result['error']:
+            logger.warning(f"Could not enrich {link}: {result['error']}")
+            if link in stale:
+                # A failed revalidation keeps the good text; only the retry waits
+                cache.put_error(stale[link], result['error'])
+            else:
+                cache.put(link, '', error=result['error'])
+                bodies[link] = ''
+            outcome = 'error'
+        else:
+            content_type = {k.lower(): v for k, v in result['headers'].items()}.get('content-type', '')
+            bodies[link] = extract_main_text(result['content']) if 'html' in content_type else ''
+            cache.put(link, bodies[link], result['headers'])
+            fetched += 1
+            outcome = 'fetched'
+        REGISTRY.inc('enrichment_pages_total', outcome=outcome)
+
+    enriched = 0
+    for link, link_articles in by_link.items():
+        body = bodies.get(link) or ''
+        for article in link_articles:
+            if body.count(' ') > article.get('summary', '').count(' '):
+                article['body'] = body
+                enriched += 1
+
+    removed = cache.prune()
+    logger.info(f"Enriched {enriched} of {len(articles)} articles ({fetched} pages crawled, "
+                f"{len(by_link) - fetched} cached or unavailable, {removed} stale pages pruned)")
+    return articles
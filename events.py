@@ -0,0 +1,131 @@
+"""
+Edition notifications for WorldSummerize
+Watches the current-edition pointer and fans new editions out to Server-Sent Event subscribers
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event, data, event_id=None):
+    """Return one Server-Sent Event frame"""
+    frame = f"event: {event}\n"
+    if event_id:
+        frame += f"id: {event_id}\n"
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
+class EditionNotifier:
+    """Single watcher that notifies every subscriber when a new edition is published"""
+
+    # The generator runs in another process, so one background thread stats
+    # the current-edition pointer (cache/current.json) every few seconds and
+    # pushes an event into each subscriber's queue when it is swapped. The cost of watching does not
+    # grow with the number of connected clients; under gevent the thread and
+    # every waiting client are greenlets, so idle connections are cheap.
+
+    def __init__(self, watch_path, interval=None, queue_size=8):
+        self.watch_path = watch_path
+        self.interval = interval or SETTINGS.get('event_poll_seconds', 5)
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.latest = None
+        self.mtime = None
+        self.thread = None
+
+    def _read_edition(self):
+        try:
+            mtime = os.stat(self.watch_path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+        try:
+            with open(self.watch_path, 'r', encoding='utf-8') as f:
+                pointer = json.load(f)
+        except (OSError, ValueError) as e:
+            # Caught mid-write; try again on the next tick
+            logger.warning(f"Could not read edition pointer {self.watch_path}: {str(e)}")
+            return False
+        self.mtime = mtime
+        changed = self.latest is None or pointer.get('id') != self.latest['id']
+        self.latest = {'id': pointer.get('id'), 'generated_at': pointer.get('generated_at')}
+        return changed
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                if self._read_edition():
+                    logger.info(f"New edition {self.latest['id']}, notifying {len(self.subscribers)} clients")
+                    self.publish(self.latest)
+            except Exception as e:
+                logger.error(f"Error watching for new editions: {str(e)}")
+
+    def start(self):
+        """Start the watcher thread once"""
+        with self.lock:
+            if self.thread is None:
+                self._read_edition()
+                self.thread = threading.Thread(target=self._watch, name='edition-notifier', daemon=True)
+                self.thread.start()
+
+    def subscribe(self):
+        """Return a new subscriber queue"""
+        self.start()
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Forget a subscriber queue"""
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, edition):
+        """Queue an edition event for every subscriber"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(edition)
+            except queue.Full:
+                # A client that is not reading only needs the newest edition,
+                # so the oldest queued event makes room for it
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    subscriber.put_nowait(edition)
+                except queue.Full:
+                    pass
+
+    def stream(self, last_event_id=None):
+        """Yield the Server-Sent Event frames of one client connection"""
+        keepalive = SETTINGS.get('event_keepalive_seconds', 25)
+        subscriber = self.subscribe()
+        try:
+            yield "retry: 10000\n\n"
+            # A reconnecting client that missed an edition catches up immediately
+            if self.latest and last_event_id and last_event_id != self.latest['id']:
+                yield format_event('edition', self.latest, self.latest['id'])
+            while True:
+                try:
+                    edition = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event('edition', edition, edition['id'])
+        finally:
+            self.unsubscribe(subscriber)
@@ -0,0 +1,115 @@
+"""
+Persistent feed cache for WorldSummerize
+Stores ETag/Last-Modified validators and the last parsed articles per feed URL
+"""
+
+import json
+import logging
+import os
+import time
+
+from config import SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Articles are cached as parsed, before cleaning, so cached text goes through
+# the cleaner exactly once like a fresh download. Entries in an older format
+# are downloaded again in full.
+CACHE_FORMAT = 'raw-1'
+
+
+def serialize_article(article):
+    """Return a JSON-safe copy of an article"""
+    article = dict(article)
+    if article.get('published') is not None:
+        article['published'] = list(article['published'])
+    return article
+
+
+def deserialize_article(article):
+    """Restore an article loaded from JSON"""
+    if article.get('published') is not None:
+        article['published'] = time.struct_time(article['published'])
+    return article
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file and swap it into place"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class FeedCache:
+    """On-disk cache of feed validators and parsed articles keyed by feed URL"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(SETTINGS.get('cache_dir', 'cache/'), 'feeds.json')
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable feed cache {self.path}: {str(e)}")
+            self.entries = {}
+
+    def conditional_headers(self, url):
+        """Return the conditional request headers for a feed and count the lookup"""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry and entry.get('format') == CACHE_FORMAT:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        if headers:
+            self.stats['hits'] += 1
+        else:
+            self.stats['misses'] += 1
+        return headers
+
+    def cached_articles(self, url):
+        """Return the articles stored for a feed after a 304 response"""
+        articles = self.stored_articles(url)
+        if articles is not None:
+            self.stats['not_modified'] += 1
+        return articles
+
+    def stored_articles(self, url):
+        """Return the raw articles stored for a feed, or None"""
+        entry = self.entries.get(url)
+        if entry is None or entry.get('format') != CACHE_FORMAT:
+            return None
+        return [deserialize_article(dict(article)) for article in entry.get('articles', [])]
+
+    def article_ids(self, url):
+        """Return the ids of the articles stored for a feed"""
+        return {article['id'] for article in self.entries.get(url, {}).get('articles', [])}
+
+    def store(self, url, headers, articles):
+        """Remember the validators and the parsed, not yet cleaned articles of a fresh download"""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.entries[url] = {
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'articles': [serialize_article(article) for article in articles],
+            'format': CACHE_FORMAT,
+            'updated_at': time.time()
+        }
+
+    def save(self):
+        """Persist the cache to disk"""
+        try:
+            write_json_atomic(self.path, self.entries)
+        except Exception as e:
+            logger.error(f"Error saving feed cache {self.path}: {str(e)}")
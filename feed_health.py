@@ -0,0 +1,159 @@
+"""
+Feed health for WorldSummerize
+Tracks how reliably each source delivers and stops polling the ones that keep failing
+"""
+
+import json
+import logging
+import os
+import time
+
+from config import SETTINGS
+from feed_cache import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states: closed sources are polled, open ones are skipped
+# until their retry time, and half-open ones get a single quick probe
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class FeedHealth:
+    """Per-source latency, error, bozo and yield statistics with a circuit breaker"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(SETTINGS.get('cache_dir', 'cache/'), 'feed_health.json')
+        self.sources = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.sources = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable feed health {self.path}: {str(e)}")
+            self.sources = {}
+
+    def save(self):
+        """Persist the health records to disk"""
+        try:
+            write_json_atomic(self.path, self.sources)
+        except Exception as e:
+            logger.error(f"Error saving feed health {self.path}: {str(e)}")
+
+    def _source(self, url):
+        return self.sources.setdefault(url, {
+            'state': CLOSED, 'failures': 0, 'trips': 0, 'retry_at': None,
+            'polls': 0, 'errors': 0, 'bozo': 0, 'parses': 0, 'entries': 0,
+            'latency': None, 'recent': [], 'last_error': None, 'last_success': None, 'last_polled': None
+        })
+
+    def plan(self, urls, now=None):
+        """Split feeds into (fetch, probe, skip) lists by the state of their circuit breakers"""
+        now = now or time.time()
+        fetch, probe, skip = [], [], []
+        for url in urls:
+            source = self.sources.get(url)
+            if source is None or source['state'] == CLOSED:
+                fetch.append(url)
+            elif source['state'] == HALF_OPEN or now >= source['retry_at']:
+                source['state'] = HALF_OPEN
+                probe.append(url)
+            else:
+                skip.append(url)
+        return fetch, probe, skip
+
+    def retry_at(self, url):
+        """Return when a skipped feed will next be probed, or None"""
+        return self.sources.get(url, {}).get('retry_at')
+
+    def _outcome(self, source, outcome):
+        source['recent'] = (source['recent'] + [outcome])[-SETTINGS.get('feed_health_window', 20):]
+
+    def record_fetch(self, url, result):
+        """Record a download; errors and 304s settle the poll, a fresh body waits for record_parse()"""
+        # A feed the run ran out of time to start was never tried, so it says nothing about the source
+        if result.get('skipped'):
+            return
+        source = self._source(url)
+        source['polls'] += 1
+        source['last_polled'] = time.time()
+        weight = SETTINGS.get('feed_latency_smoothing', 0.3)
+        if source['latency'] is None:
+            source['latency'] = result['elapsed']
+        else:
+            source['latency'] = weight * result['elapsed'] + (1 - weight) * source['latency']
+        if result['error']:
+            source['errors'] += 1
+            self._failure(url, source, 'error', result['error'])
+        elif result['status'] == 304:
+            self._success(url, source)
+
+    def record_parse(self, url, entries, bozo=False):
+        """Record the parse of a downloaded feed; a malformed feed counts as a failure"""
+        source = self._source(url)
+        source['parses'] += 1
+        source['entries'] += entries
+        if bozo:
+            source['bozo'] += 1
+            self._failure(url, source, 'bozo', 'malformed feed')
+        else:
+            self._success(url, source)
+
+    def _success(self, url, source):
+        self._outcome(source, 'ok')
+        source['failures'] = 0
+        source['last_success'] = time.time()
+        if source['state'] != CLOSED:
+            logger.info(f"Feed {url} recovered")
+        source.update(state=CLOSED, trips=0, retry_at=None)
+
+    def _failure(self, url, source, outcome, error):
+        self._outcome(source, outcome)
+        source['failures'] += 1
+        source['last_error'] = error
+        if source['state'] != HALF_OPEN and source['failures'] < SETTINGS.get('breaker_failures', 3):
+            return
+        # Each trip in a row keeps the feed out for twice as long
+        source['trips'] += 1
+        pause = min(SETTINGS.get('breaker_open_minutes', 30) * 60 * 2 ** (source['trips'] - 1),
+                    SETTINGS.get('breaker_max_open_hours', 24) * 3600)
+        source['state'] = OPEN
+        source['retry_at'] = time.time() + pause
+        logger.warning(f"Feed {url} failed {source['failures']} times in a row ({error}); "
+                       f"skipping it for {pause / 60:.0f} minutes")
+
+    def report(self, urls):
+        """Return the health of each configured source, sickest first"""
+        report = []
+        for url in urls:
+            source = self.sources.get(url)
+            if source is None:
+                report.append({'url': url, 'state': 'unknown', 'needs_attention': False})
+                continue
+            recent = source['recent']
+            error_rate = recent.count('error') / len(recent) if recent else 0.0
+            bozo_rate = recent.count('bozo') / len(recent) if recent else 0.0
+            report.append({
+                'url': url,
+                'state': source['state'],
+                'error_rate': round(error_rate, 3),
+                'bozo_rate': round(bozo_rate, 3),
+                'latency_seconds': round(source['latency'], 3) if source['latency'] is not None else None,
+                'entries_per_download': round(source['entries'] / source['parses'], 1) if source['parses'] else None,
+                'polls': source['polls'],
+                'consecutive_failures': source['failures'],
+                'trips': source['trips'],
+                'retry_at': source['retry_at'],
+                'last_error': source['last_error'],
+                'last_success': source['last_success'],
+                'last_polled': source['last_polled'],
+                # Sources that keep tripping or mostly fail are candidates for replacement
+                'needs_attention': source['state'] != CLOSED or error_rate + bozo_rate >= 0.5
+            })
+        report.sort(key=lambda entry: (not entry['needs_attention'], -entry.get('error_rate', 0), entry['url']))
+        return report
@@ -0,0 +1,130 @@
+"""
+Feed schedule for WorldSummerize
+Learns how often each feed publishes and decides when to poll it and when to publish
+"""
+
+import calendar
+import json
+import logging
+import os
+import random
+import time
+
+from config import SETTINGS
+from feed_cache import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def publish_gap(articles):
+    """Return the mean seconds between a feed's entries from their publication times, or None"""
+    timestamps = sorted(calendar.timegm(article['published']) for article in articles
+                        if article.get('published') is not None)
+    if len(timestamps) < 2 or timestamps[-1] == timestamps[0]:
+        return None
+    return (timestamps[-1] - timestamps[0]) / (len(timestamps) - 1)
+
+
+class FeedSchedule:
+    """Per-feed polling intervals learned from publication rates, with backoff for failing feeds"""
+
+    # The state lives in one JSON file so the scheduler, which only asks when
+    # the next feed is due, and the generator, which polls and records, agree
+    # without sharing memory.
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(SETTINGS.get('cache_dir', 'cache/'), 'feed_schedule.json')
+        self.feeds = {}
+        self.pending_new = 0
+        self.last_published = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.feeds = state.get('feeds', {})
+            self.pending_new = state.get('pending_new', 0)
+            self.last_published = state.get('last_published')
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable feed schedule {self.path}: {str(e)}")
+
+    def save(self):
+        """Persist the schedule to disk"""
+        try:
+            write_json_atomic(self.path, {'feeds': self.feeds, 'pending_new': self.pending_new,
+                                          'last_published': self.last_published})
+        except Exception as e:
+            logger.error(f"Error saving feed schedule {self.path}: {str(e)}")
+
+    def _limits(self):
+        return (SETTINGS.get('feed_poll_min_minutes', 5) * 60, SETTINGS.get('feed_poll_max_minutes', 180) * 60)
+
+    def _next_poll(self, interval, now):
+        # Spread feeds with the same interval so they do not all fall due together
+        jitter = SETTINGS.get('feed_poll_jitter', 0.1)
+        return now + interval * random.uniform(1 - jitter, 1 + jitter)
+
+    def due(self, urls, now=None):
+        """Return the feeds whose next poll time has come; feeds never polled are always due"""
+        now = now or time.time()
+        return [url for url in urls if self.feeds.get(url, {}).get('next_poll', 0) <= now]
+
+    def next_due(self, urls):
+        """Return the earliest next poll time among the feeds"""
+        return min((self.feeds.get(url, {}).get('next_poll', 0) for url in urls), default=None)
+
+    def record(self, url, articles=None, new=0, error=None, now=None):
+        """Record the outcome of polling a feed and set its next poll time"""
+        now = now or time.time()
+        low, high = self._limits()
+        state = self.feeds.setdefault(url, {'interval': SETTINGS.get('update_interval_hours', 1) * 3600,
+                                            'gap': None, 'failures': 0})
+        state['last_polled'] = now
+
+        if error:
+            # Failing feeds are retried ever less often, up to the longest interval
+            state['failures'] += 1
+            backoff = min(state['interval'] * 2 ** state['failures'], high)
+            state['next_poll'] = self._next_poll(backoff, now)
+            state['error'] = error
+            return
+
+        state['failures'] = 0
+        state['error'] = None
+        gap = publish_gap(articles) if articles else None
+        if gap is not None:
+            # Smooth the learned gap so one burst of stories does not swing it
+            weight = SETTINGS.get('feed_rate_smoothing', 0.3)
+            state['gap'] = gap if state['gap'] is None else weight * gap + (1 - weight) * state['gap']
+            interval = state['gap'] * SETTINGS.get('feed_poll_factor', 0.5)
+        elif new:
+            interval = state['interval'] / 2
+        else:
+            # Nothing new and no dates to learn from: ask less often
+            interval = state['interval'] * 1.5
+        state['interval'] = min(max(interval, low), high)
+        state['next_poll'] = self._next_poll(state['interval'], now)
+        self.pending_new += new
+
+    def defer(self, url, until):
+        """Hold off polling a feed until a given time, e.g. while its circuit breaker is open"""
+        if until is not None:
+            self.feeds.setdefault(url, {'interval': SETTINGS.get('update_interval_hours', 1) * 3600,
+                                        'gap': None, 'failures': 0})['next_poll'] = until
+
+    def should_publish(self, now=None):
+        """Return whether enough new stories have arrived to publish a new edition"""
+        now = now or time.time()
+        if self.pending_new >= SETTINGS.get('publish_min_new_articles', 5):
+            return True
+        # A trickle of new stories is published once the edition gets old
+        max_wait = SETTINGS.get('update_interval_hours', 1) * 3600
+        return self.pending_new > 0 and (self.last_published is None or now - self.last_published >= max_wait)
+
+    def published(self, now=None):
+        """Record that an edition with every pending story was published"""
+        self.pending_new = 0
+        self.last_published = now or time.time()
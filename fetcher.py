@@ -0,0 +1,159 @@
+"""
+Concurrent feed fetcher for WorldSummerize
+Downloads feeds in parallel over pooled keep-alive sessions
+"""
+
+import itertools
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import SETTINGS
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared keep-alive session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # One connection pool per host, each holding a few keep-alive sockets
+            adapter = HTTPAdapter(
+                pool_connections=SETTINGS.get('fetch_pool_hosts', 64),
+                pool_maxsize=SETTINGS.get('fetch_pool_per_host', 4)
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = SETTINGS.get('user_agent', 'WorldSummarize/1.0')
+            _session = session
+    return _session
+
+
+def fetch_url(url, deadline=None, headers=None, max_bytes=None, metric='fetch', timeout=None):
+    """Download a URL within a hard deadline and return a fetch result dict"""
+    # metric prefixes the names the download is counted under, so article
+    # pages are not mixed into the feed download metrics
+    start = time.monotonic()
+    timeout = timeout or SETTINGS.get('fetch_timeout_seconds', 10)
+    max_bytes = max_bytes or SETTINGS.get('fetch_max_bytes', 5 * 1024 * 1024)
+    if deadline is None:
+        deadline = start + timeout
+    deadline = min(deadline, start + timeout)
+
+    result = {
+        'url': url,
+        'status': None,
+        'content': None,
+        'headers': {},
+        'elapsed': 0.0,
+        'error': None,
+        'skipped': False
+    }
+
+    try:
+        remaining = max(deadline - time.monotonic(), 0.1)
+        with get_session().get(url, headers=headers, timeout=(min(remaining, 5), remaining),
+                               stream=True) as response:
+            result['status'] = response.status_code
+            result['headers'] = dict(response.headers)
+
+            # Read the body in chunks so the deadline and size cap are enforced
+            # even when the server trickles bytes slower than the read timeout
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"response exceeded {max_bytes} bytes")
+                if time.monotonic() > deadline:
+                    raise TimeoutError("deadline exceeded")
+            result['content'] = b''.join(chunks)
+
+            if response.status_code >= 400:
+                result['error'] = f"HTTP {response.status_code}"
+
+    except Exception as e:
+        result['error'] = str(e) or e.__class__.__name__
+
+    result['elapsed'] = time.monotonic() - start
+    host = urlparse(url).netloc
+    if result['error']:
+        outcome = 'error'
+    elif result['status'] == 304:
+        outcome = 'not_modified'
+    else:
+        outcome = 'ok'
+    REGISTRY.observe(f'{metric}_seconds', result['elapsed'], host=host)
+    REGISTRY.inc(f'{metric}_requests_total', host=host, outcome=outcome)
+    REGISTRY.inc(f'{metric}_bytes_total', len(result['content'] or b''), host=host)
+    return result
+
+
+def fetch_feeds(urls, request_headers=None, probe_urls=()):
+    """Download feeds concurrently, yielding fetch results as they complete"""
+    urls = list(urls)
+    request_headers = request_headers or {}
+    probe_urls = set(probe_urls)
+    if not urls:
+        return
+
+    # Each download gets its full timeout from the moment it starts. The
+    # run-wide budget only decides whether a feed is started at all, so feeds
+    # late in a long list are skipped rather than started with no time left.
+    run_deadline = time.monotonic() + SETTINGS.get('fetch_deadline_seconds', 30)
+    max_workers = min(len(urls), SETTINGS.get('fetch_workers', 16))
+    skipped = []
+
+    def submit(url):
+        if time.monotonic() >= run_deadline:
+            skipped.append(url)
+            return None
+        # Probes of failing sources get a short timeout of their own
+        timeout = SETTINGS.get('feed_probe_timeout_seconds', 3) if url in probe_urls else None
+        return executor.submit(fetch_url, url, None, request_headers.get(url), timeout=timeout)
+
+    # Keep a bounded window of downloads in flight so finished bodies never pile
+    # up faster than the caller consumes them
+    pending_urls = iter(urls)
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch') as executor:
+        for url in itertools.islice(pending_urls, max_workers * 2):
+            future = submit(url)
+            if future is not None:
+                in_flight.add(future)
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result['error']:
+                    logger.warning(f"Failed to fetch {result['url']}: {result['error']}")
+                elif result['status'] == 304:
+                    logger.info(f"Not modified: {result['url']} ({result['elapsed']:.2f}s)")
+                else:
+                    logger.info(f"Fetched {result['url']} ({len(result['content'])} bytes "
+                                f"in {result['elapsed']:.2f}s)")
+                yield result
+                for url in itertools.islice(pending_urls, 1):
+                    future = submit(url)
+                    if future is not None:
+                        in_flight.add(future)
+
+    # Whatever was not started within the budget is reported, not downloaded
+    skipped.extend(pending_urls)
+    if skipped:
+        logger.warning(f"Fetch budget exhausted, skipped {len(skipped)} feeds")
+    for url in skipped:
+        yield {'url': url, 'status': None, 'content': None, 'headers': {}, 'elapsed': 0.0,
+               'error': 'fetch budget exhausted', 'skipped': True}
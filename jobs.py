@@ -0,0 +1,213 @@
+"""
+Generation jobs for WorldSummerize
+A lock file elects one generator and a SQLite queue serializes its runs
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config import SETTINGS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    reason TEXT,
+    status TEXT NOT NULL,
+    requested_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+"""
+
+
+class LeaderLock:
+    """Exclusive lock file held by the one process allowed to generate editions"""
+
+    # The operating system drops the lock when the holder exits or crashes,
+    # so a standby process can take over without stale-lock cleanup.
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('leader_lock_path', 'cache/generator.lock')
+        self.file = None
+
+    def acquire(self):
+        """Try to become the leader without blocking; return whether we are"""
+        if self.file is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self.file = lock_file
+        return True
+
+    def release(self):
+        """Give up leadership"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class JobQueue:
+    """Persistent queue of generation jobs shared by every process on the host"""
+
+    # Each call opens its own short-lived connection, so web workers and the
+    # generator can use the queue from any thread. Writes run in IMMEDIATE
+    # transactions, which serializes check-then-insert across processes.
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('job_queue_path', 'cache/jobs.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Connection(conn)
+
+    def enqueue(self, kind='scrape', reason=None):
+        """Queue a job unless one of the same kind is already waiting; return (id, created)"""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT id FROM jobs WHERE kind = ? AND status = 'queued' ORDER BY id LIMIT 1",
+                               (kind,)).fetchone()
+            if row is not None:
+                conn.execute('COMMIT')
+                return row['id'], False
+            cursor = conn.execute("INSERT INTO jobs (kind, reason, status, requested_at) VALUES (?, ?, 'queued', ?)",
+                                  (kind, reason, time.time()))
+            conn.execute('COMMIT')
+            logger.info(f"Queued {kind} job {cursor.lastrowid} ({reason})")
+            return cursor.lastrowid, True
+
+    def claim(self):
+        """Mark the oldest queued job as running and return it, or None"""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row['id']))
+            conn.execute('COMMIT')
+            return dict(row) if row is not None else None
+
+    def finish(self, job_id, error=None):
+        """Record the outcome of a job"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                         ('failed' if error else 'done', time.time(), error, job_id))
+
+    def get(self, job_id):
+        """Return a job as a dict, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return dict(row) if row is not None else None
+
+    def last_run(self, kind='scrape'):
+        """Return when the latest job of a kind finished, or started if it is still running, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(COALESCE(finished_at, started_at)) FROM jobs "
+                               "WHERE kind = ? AND started_at IS NOT NULL", (kind,)).fetchone()
+            return row[0]
+
+    def recover(self):
+        """Fail jobs left running by a generator that died, called by a new leader"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = 'interrupted' "
+                         "WHERE status = 'running'", (time.time(),))
+
+    def prune(self, max_age_days=7):
+        """Forget finished jobs older than max_age_days"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                         (time.time() - max_age_days * 86400,))
+
+
+class _Connection:
+    """Context manager closing a sqlite3 connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None and self.conn.in_transaction:
+            self.conn.execute('ROLLBACK')
+        self.conn.close()
+
+
+class JobRunner:
+    """Worker thread running queued jobs one at a time"""
+
+    def __init__(self, queue, handlers, poll_seconds=None):
+        self.queue = queue
+        self.handlers = handlers
+        self.poll_seconds = poll_seconds or SETTINGS.get('job_poll_seconds', 5)
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def run_next(self):
+        """Run the oldest queued job, returning False when there was none"""
+        job = self.queue.claim()
+        if job is None:
+            return False
+        logger.info(f"Starting {job['kind']} job {job['id']} ({job['reason']})")
+        try:
+            self.handlers[job['kind']]()
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {str(e)}")
+            self.queue.finish(job['id'], error=str(e) or e.__class__.__name__)
+        else:
+            logger.info(f"Finished {job['kind']} job {job['id']}")
+            self.queue.finish(job['id'])
+        return True
+
+    def _work(self):
+        while not self.stopping.is_set():
+            try:
+                if not self.run_next():
+                    self.stopping.wait(self.poll_seconds)
+            except Exception as e:
+                logger.error(f"Job runner error: {str(e)}")
+                self.stopping.wait(self.poll_seconds)
+
+    def start(self):
+        """Start the worker thread"""
+        self.thread = threading.Thread(target=self._work, name='job-runner', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Ask the worker thread to exit after its current job"""
+        self.stopping.set()
@@ -0,0 +1,194 @@
+"""
+Text layout for WorldSummerize PDFs
+Width-accurate line breaking and pagination from cached font metrics
+"""
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from config import PDF_SETTINGS
+
+# Words measured per font before the word cache is cleared
+WORD_CACHE_SIZE = 50000
+
+
+class FontMetrics:
+    """Advance widths of one font at one size, measured once and cached"""
+
+    # The standard PDF fonts have no kerning, so the width of a word is the sum
+    # of its glyph advances. Latin-1 glyphs are measured up front into a flat
+    # table, anything else the first time it is seen, and whole words are
+    # memoized since news text repeats the same words constantly.
+
+    def __init__(self, font_name, size):
+        self.font_name = font_name
+        self.size = size
+        self.table = [stringWidth(chr(code), font_name, size) for code in range(256)]
+        self.extra = {}
+        self.words = {}
+        self.space = self.table[32]
+
+    def char_width(self, char):
+        """Return the advance width of a single character"""
+        code = ord(char)
+        if code < 256:
+            return self.table[code]
+        width = self.extra.get(char)
+        if width is None:
+            width = self.extra[char] = stringWidth(char, self.font_name, self.size)
+        return width
+
+    def width(self, text):
+        """Return the width of a string"""
+        width = self.words.get(text)
+        if width is None:
+            try:
+                width = sum(map(self.table.__getitem__, text.encode('latin-1')))
+            except UnicodeEncodeError:
+                width = sum(map(self.char_width, text))
+            if len(self.words) >= WORD_CACHE_SIZE:
+                self.words.clear()
+            self.words[text] = width
+        return width
+
+
+_metrics = {}
+
+
+def get_metrics(font_name, size):
+    """Return the shared metrics for a font and size"""
+    key = (font_name, size)
+    metrics = _metrics.get(key)
+    if metrics is None:
+        metrics = _metrics[key] = FontMetrics(font_name, size)
+    return metrics
+
+
+def _split_word(word, metrics, max_width):
+    """Break a word wider than a whole line into pieces that fit"""
+    pieces = []
+    piece = ''
+    for char in word:
+        if piece and metrics.width(piece + char) > max_width:
+            pieces.append(piece)
+            piece = ''
+        piece += char
+    pieces.append(piece)
+    return pieces
+
+
+def break_lines(runs, max_width):
+    """Greedily break styled (metrics, text) runs into lines of (metrics, text, x) segments"""
+    # Runs are laid out one after another, so a bold headline can be followed
+    # by regular body text on the same line
+    lines = []
+    line = []
+    x = 0
+    for metrics, text in runs:
+        for word in text.split():
+            word_width = metrics.width(word)
+            if word_width > max_width:
+                pieces = _split_word(word, metrics, max_width)
+            else:
+                pieces = [word]
+            for piece in pieces:
+                piece_width = metrics.width(piece)
+                gap = metrics.space if line else 0
+                if line and x + gap + piece_width > max_width:
+                    lines.append(line)
+                    line, x, gap = [], 0, 0
+                # Extend the previous segment when the style is unchanged
+                if line and line[-1][0] is metrics:
+                    previous = line[-1]
+                    line[-1] = (metrics, f"{previous[1]} {piece}", previous[2])
+                else:
+                    line.append((metrics, piece, x + gap))
+                x += gap + piece_width
+    if line:
+        lines.append(line)
+    return lines
+
+
+def truncate_lines(lines, max_lines, max_width):
+    """Keep at most max_lines lines, ending the last kept line with an ellipsis"""
+    if len(lines) <= max_lines:
+        return lines
+    lines = lines[:max_lines]
+    metrics, text, x = lines[-1][-1]
+    ellipsis = '...'
+    words = text.split()
+    while words and x + metrics.width(' '.join(words) + ellipsis) > max_width:
+        words.pop()
+    lines[-1] = lines[-1][:-1] + [(metrics, ' '.join(words) + ellipsis, x)]
+    return lines
+
+
+def paginate(items, page_size, first_page_top, max_pages=None):
+    """Lay out formatted items and yield each page as a list of draw operations"""
+    # Draw operations are (font_name, size, x, y, text) tuples. Pages are
+    # yielded as soon as they are full and end with a centred page number.
+    width, height = page_size
+    margin_left = PDF_SETTINGS.get('margin_left', 40)
+    margin_right = PDF_SETTINGS.get('margin_right', 40)
+    margin_top = PDF_SETTINGS.get('margin_top', 50)
+    # Leave room for the page number below the last line
+    bottom = PDF_SETTINGS.get('margin_bottom', 50) + 40
+    text_width = width - margin_left - margin_right
+
+    heading = get_metrics('Helvetica-Bold', PDF_SETTINGS.get('heading_font_size', 14))
+    title = get_metrics('Helvetica-Bold', PDF_SETTINGS.get('body_font_size', 10) + 1)
+    body = get_metrics('Helvetica', PDF_SETTINGS.get('body_font_size', 10))
+    leading = PDF_SETTINGS.get('line_spacing', 12)
+    max_lines = PDF_SETTINGS.get('max_article_lines', 8)
+
+    footer = get_metrics('Helvetica', 9)
+
+    page_number = 1
+    page = []
+    y = first_page_top
+
+    def finish_page():
+        label = f"Page {page_number}"
+        page.append((footer.font_name, footer.size, (width - footer.width(label)) / 2, 30, label))
+        return page
+
+    for item in items:
+        if item['type'] == 'category':
+            y -= 20
+            block = [[(heading, item['text'], 0)]]
+            advance = [20]
+            # Keep a heading together with the first line under it
+            keep_with_next = 20
+        else:
+            runs = [(title, f"{item['title']}:" if item['summary'] else item['title'])]
+            if item['summary']:
+                runs.append((body, item['summary']))
+            block = truncate_lines(break_lines(runs, text_width), max_lines, text_width)
+            # Lines that start with the bold headline get the headline's leading
+            advance = [leading + 2 if line[0][0] is title else leading for line in block]
+            keep_with_next = 0
+
+        if y - keep_with_next < bottom:
+            yield finish_page()
+            if max_pages and page_number >= max_pages:
+                return
+            page_number += 1
+            page = []
+            y = height - margin_top
+
+        for line, step in zip(block, advance):
+            if y < bottom:
+                yield finish_page()
+                if max_pages and page_number >= max_pages:
+                    return
+                page_number += 1
+                page = []
+                y = height - margin_top
+            for metrics, text, x in line:
+                page.append((metrics.font_name, metrics.size, margin_left + x, y, text))
+            y -= step
+
+        # Space between articles
+        if item['type'] == 'article':
+            y -= 8
+
+    yield finish_page()
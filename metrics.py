@@ -0,0 +1,166 @@
+"""
+Metrics registry for WorldSummerize
+In-process counters, gauges and timers, exported as JSON run profiles and Prometheus text
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Recent observations kept per timer for the quantiles
+WINDOW = 512
+QUANTILES = (0.5, 0.95)
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Timer:
+    """Running totals of one timed operation plus a rolling window of recent durations"""
+
+    __slots__ = ('count', 'total', 'max', 'recent')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def quantile(self, q):
+        """Return a quantile of the recent durations"""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Registry:
+    """Thread-safe registry of labelled counters, gauges and timers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}
+        self.started_at = time.time()
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter"""
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge"""
+        with self.lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration of a timer"""
+        key = _key(name, labels)
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                timer = self.timers[key] = Timer()
+            timer.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.timers.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Return everything recorded as a JSON-serializable dict"""
+        with self.lock:
+            return {
+                'started_at': self.started_at,
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                'gauges': [{'name': name, 'labels': dict(labels), 'value': value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+                'timers': [{'name': name, 'labels': dict(labels), 'count': timer.count,
+                            'sum': timer.total, 'max': timer.max,
+                            'quantiles': {str(q): timer.quantile(q) for q in QUANTILES}}
+                           for (name, labels), timer in sorted(self.timers.items())]
+            }
+
+    def timed(self, name, **labels):
+        """Decorator timing every call of a function"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def totals(self, name, label):
+        """Return the summed duration of a timer for each value of one label"""
+        totals = {}
+        with self.lock:
+            for (timer_name, labels), timer in self.timers.items():
+                if timer_name == name:
+                    value = dict(labels).get(label)
+                    totals[value] = totals.get(value, 0.0) + timer.total
+        return totals
+
+
+def _labels(labels, extra=None):
+    labels = dict(labels, **(extra or {}))
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def prometheus_text(snapshot, prefix='worldsummarize_'):
+    """Render a snapshot in the Prometheus text exposition format"""
+    lines = []
+    declared = set()
+
+    def declare(name, kind):
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    for metric in snapshot['counters']:
+        name = prefix + metric['name']
+        declare(name, 'counter')
+        lines.append(f"{name}{_labels(metric['labels'])} {metric['value']}")
+    for metric in snapshot['gauges']:
+        name = prefix + metric['name']
+        declare(name, 'gauge')
+        lines.append(f"{name}{_labels(metric['labels'])} {metric['value']}")
+    for metric in snapshot['timers']:
+        name = prefix + metric['name']
+        declare(name, 'summary')
+        for q, value in metric['quantiles'].items():
+            lines.append(f"{name}{_labels(metric['labels'], {'quantile': q})} {value:.6f}")
+        lines.append(f"{name}_sum{_labels(metric['labels'])} {metric['sum']:.6f}")
+        lines.append(f"{name}_count{_labels(metric['labels'])} {metric['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
@@ -0,0 +1,149 @@
+"""
+Edition publishing for WorldSummerize
+Writes each edition to versioned files and atomically swaps the pointer to the current one
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from config import SETTINGS
+from archive_catalog import ArchiveCatalog
+from archive_store import EditionStore, enforce_retention
+from assets import publish_file, write_durable
+from document import article_entry
+from metrics import REGISTRY
+from renderers import render
+from search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('pdf', 'html', 'json')
+
+
+def current_path():
+    """Return the path of the current-edition pointer"""
+    return SETTINGS.get('current_edition_path', os.path.join(SETTINGS.get('cache_dir', 'cache/'), 'current.json'))
+
+
+def read_current(path=None):
+    """Return the current-edition pointer, or None before the first publish"""
+    try:
+        with open(path or current_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def edition_path(edition_id, output_format):
+    """Return the versioned path of one format of an edition"""
+    return os.path.join(SETTINGS.get('archive_path', 'archive/'), f"world_summary_{edition_id}.{output_format}")
+
+
+def link_latest(source, target):
+    """Atomically point a fixed path such as world_summary.pdf at a versioned file"""
+    tmp_path = f"{target}.tmp"
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        os.link(source, tmp_path)
+        os.replace(tmp_path, target)
+    except OSError:
+        # No hard links on this filesystem; fall back to a durable copy
+        with open(source, 'rb') as f:
+            write_durable(target, f.read())
+
+
+def publish_edition(document, registry=None, pool=None):
+    """Render a document to versioned files and make it the current edition"""
+    # Nothing a reader can see changes until the pointer is swapped, so a
+    # failed render leaves the previous edition in place
+    files = {}
+    for output_format in OUTPUT_FORMATS:
+        path = edition_path(document['id'], output_format)
+        files[output_format] = publish_file(path, render(document, output_format))
+
+    # Every edition is also kept as a compact document, from which its files
+    # can be rendered again once retention has deleted them
+    store = EditionStore()
+    store.add(document)
+
+    previous = read_current()
+    pointer = {'id': document['id'], 'generated_at': document['generated_at'], 'files': files}
+
+    # The run's candidate stories of every category, best first, from which
+    # custom editions are put together
+    if pool is not None:
+        articles_path = edition_path(document['id'], 'articles.json')
+        entries = [dict(article_entry(article), category=category)
+                   for category, articles in pool.items() for article in articles]
+        write_durable(articles_path, json.dumps({'edition': document['id'], 'articles': entries},
+                                                ensure_ascii=False).encode('utf-8'))
+        pointer['articles'] = articles_path
+
+    # The run's timings and counts are kept alongside the edition they produced
+    if registry is not None:
+        registry.set('run_seconds', time.time() - registry.started_at)
+        profile_path = edition_path(document['id'], 'profile.json')
+        write_durable(profile_path, json.dumps(registry.snapshot(), indent=2).encode('utf-8'))
+        pointer['profile'] = profile_path
+
+    write_durable(current_path(), json.dumps(pointer, indent=2).encode('utf-8'))
+    logger.info(f"Published edition {document['id']}")
+
+    # Keep the fixed output paths for anyone reading the files directly
+    for output_format, published in files.items():
+        target = SETTINGS.get(f'{output_format}_output_path', f'world_summary.{output_format}')
+        link_latest(published['path'], target)
+
+    # Archiving the previous edition is just a catalog entry; its files are already in place
+    catalog = ArchiveCatalog()
+    # Only the generator writes the manifest, seeding it once from archives made
+    # before it existed; the edition just published is live, not archived
+    catalog.seed(exclude=[os.path.basename(files['pdf']['path'])])
+    if previous and previous['id'] != document['id']:
+        previous_pdf = previous['files']['pdf']['path']
+        if os.path.exists(previous_pdf):
+            catalog.add(previous_pdf)
+            logger.info(f"Archived previous summary {previous_pdf}")
+    try:
+        enforce_retention(catalog, store)
+    except Exception as e:
+        logger.error(f"Error applying archive retention: {str(e)}")
+
+    # The edition is live whether or not indexing succeeds; a failed edition
+    # is picked up by the backfill of the next empty index
+    try:
+        with REGISTRY.timer('stage_seconds', stage='index'):
+            index = SearchIndex()
+            if index.count() == 0:
+                logger.info(f"Backfilled the search index from {index.backfill()} archived editions")
+            index.add_edition(document)
+    except Exception as e:
+        logger.error(f"Error indexing edition {document['id']}: {str(e)}")
+    return pointer
+
+
+class CurrentEdition:
+    """In-memory copy of the current-edition pointer, reloaded when it is swapped"""
+
+    def __init__(self, path=None):
+        self.path = path or current_path()
+        self.pointer = None
+        self.mtime = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        """Return the current-edition pointer, or None before the first publish"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+        with self.lock:
+            if mtime != self.mtime:
+                pointer = read_current(self.path)
+                if pointer is not None:
+                    self.pointer, self.mtime = pointer, mtime
+            return self.pointer
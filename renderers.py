@@ -0,0 +1,145 @@
+"""
+Edition renderers for WorldSummerize
+Turns the edition document into PDF, HTML and JSON, rendering each format once per edition
+"""
+
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from config import SETTINGS
+from document import display_summary
+from layout import paginate
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+_templates = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(['html']))
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def layout_items(document):
+    """Yield category headers and articles of a document in reading order"""
+    for section in document['sections']:
+        yield {"type": "category", "text": section['category'].upper()}
+        for entry in section['articles']:
+            yield {
+                "type": "article",
+                "title": entry['title'],
+                "summary": display_summary(entry),
+                "source": entry['source']
+            }
+
+
+def render_pdf(document):
+    """Render a document as a paginated PDF"""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    # Title page
+    c.setFont("Helvetica-Bold", 28)
+    c.drawCentredString(width/2, height - 100, document['title'])
+
+    c.setFont("Helvetica", 16)
+    c.drawCentredString(width/2, height - 140, document['subtitle'])
+
+    c.setFont("Helvetica", 14)
+    generated_at = datetime.fromisoformat(document['generated_at'])
+    c.drawCentredString(width/2, height - 170, generated_at.strftime("%B %d, %Y - %I:%M %p"))
+
+    # Draw a decorative line
+    c.setLineWidth(2)
+    c.line(100, height - 200, width - 100, height - 200)
+
+    # Lay out the articles below the title block and draw each page as soon as it is full
+    max_pages = document.get('max_pages') or SETTINGS.get('max_pages', 4)
+    pages = paginate(layout_items(document), A4, height - 250, max_pages)
+    for page_number, operations in enumerate(pages, start=1):
+        if page_number > 1:
+            c.showPage()
+        font = None
+        for font_name, size, x, y, text in operations:
+            if (font_name, size) != font:
+                font = (font_name, size)
+                c.setFont(font_name, size)
+            c.drawString(x, y, text)
+
+    c.save()
+    return buffer.getvalue()
+
+
+def render_html(document):
+    """Render a document as a standalone HTML page"""
+    generated_at = datetime.fromisoformat(document['generated_at'])
+    return _templates.get_template('edition.html').render(
+        document=document,
+        generated_at=generated_at.strftime("%B %d, %Y - %I:%M %p"),
+        display_summary=display_summary
+    ).encode('utf-8')
+
+
+def render_json(document):
+    """Render a document as a compact JSON feed"""
+    return json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Output format -> (renderer, MIME type)
+RENDERERS = {
+    'pdf': (render_pdf, 'application/pdf'),
+    'html': (render_html, 'text/html; charset=utf-8'),
+    'json': (render_json, 'application/json')
+}
+
+
+def mimetype(output_format):
+    """Return the MIME type of an output format"""
+    return RENDERERS[output_format][1]
+
+
+def render_document(document, output_format):
+    """Render a document in one output format, without caching"""
+    renderer = RENDERERS[output_format][0]
+    with REGISTRY.timer('render_seconds', format=output_format):
+        output = renderer(document)
+    REGISTRY.inc('render_bytes_total', len(output), format=output_format)
+    return output
+
+
+def render(document, output_format):
+    """Return the rendered bytes of a document, reusing earlier renders of the same edition"""
+    global _cache_bytes
+    key = (document['id'], output_format)
+    with _cache_lock:
+        output = _cache.get(key)
+        if output is not None:
+            _cache.move_to_end(key)
+            return output
+
+    # Rendered outside the lock so a slow PDF does not hold up cache hits
+    output = render_document(document, output_format)
+    with _cache_lock:
+        if key in _cache:
+            # Another request rendered the same edition meanwhile
+            _cache.move_to_end(key)
+            return _cache[key]
+        # Bounded by count and by size, since archived editions are rendered on request
+        _cache[key] = output
+        _cache_bytes += len(output)
+        max_bytes = SETTINGS.get('render_cache_bytes', 16 * 1024 * 1024)
+        while len(_cache) > 1 and (len(_cache) > SETTINGS.get('render_cache_size', 8) or _cache_bytes > max_bytes):
+            _cache_bytes -= len(_cache.popitem(last=False)[1])
+    logger.info(f"Rendered edition {document['id']} as {output_format} ({len(output)} bytes)")
+    return output
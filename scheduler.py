@@ -2,7 +2,10 @@ import schedule
 import time
 import logging
 from datetime import datetime
-from worldsummerize import main
+from config import NEWS_SOURCES, SETTINGS
+from feed_schedule import FeedSchedule
+from jobs import JobQueue, JobRunner, LeaderLock
+from worldsummerize import main, poll_feeds
 
 # Setup logging
 logging.basicConfig(
@@ -11,34 +14,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_with_logging():
-    """Wrapper function to run main with error handling"""
-    try:
-        logger.info("Starting scheduled news scraping...")
-        main()
-        logger.info("Scheduled news scraping completed successfully")
-    except Exception as e:
-        logger.error(f"Error during scheduled run: {str(e)}")
+def enqueue_due_polls(queue):
+    """Queue a poll when any feed's adaptive interval has run out"""
+    next_due = FeedSchedule().next_due(NEWS_SOURCES['rss_feeds'])
+    if next_due is not None and next_due <= time.time():
+        queue.enqueue(kind='poll', reason='schedule')
+
+def schedule_runs(queue):
+    """Check for due feeds regularly; each feed sets its own polling interval"""
+    schedule.every(SETTINGS.get('feed_poll_check_seconds', 60)).seconds.do(enqueue_due_polls, queue)
+    schedule.every(1).days.do(queue.prune)
 
 if __name__ == '__main__':
     logger.info("WorldSummarize Scheduler started")
+
+    # Only one scheduler per host generates editions; others wait as standbys
+    lock = LeaderLock()
+    if not lock.acquire():
+        logger.info("Another scheduler is generating editions. Waiting to take over...")
+        while not lock.acquire():
+            time.sleep(30)
+    logger.info("This scheduler is now the generator")
+
+    queue = JobQueue()
+    queue.recover()
+
+    # Runs happen on a worker thread, so a slow run never blocks the schedule
+    # and a run requested while another is in progress waits its turn
+    runner = JobRunner(queue, {'scrape': main, 'poll': poll_feeds})
+    runner.start()
+
     logger.info("Running initial news scraping...")
-    
-    # Run immediately on start
-    run_with_logging()
-    
-    # Schedule to run every hour
-    schedule.every(1).hour.do(run_with_logging)
-    
-    logger.info("Scheduler is now running. Will update every hour.")
+    queue.enqueue(reason='startup')
+    schedule_runs(queue)
+
+    logger.info("Scheduler is now running. Feeds are polled as often as they publish.")
     logger.info("Press Ctrl+C to stop.")
-    
+
     # Keep the script running
     try:
         while True:
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            time.sleep(30)  # Check twice a minute
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
     except Exception as e:
         logger.error(f"Scheduler error: {str(e)}")
+    finally:
+        runner.stop()
+        lock.release()
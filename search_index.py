@@ -0,0 +1,244 @@
+"""
+Search index for WorldSummerize
+Full-text index of every published article in SQLite FTS5, updated as each edition is published
+"""
+
+import calendar
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+from config import SETTINGS
+from archive_store import edition_id
+
+logger = logging.getLogger(__name__)
+
+# Articles hold the stored fields and the FTS5 table indexes their text as
+# external content, kept in step by triggers. Dates are UTC epoch seconds so
+# range filters use the (category, published) index.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    rowid INTEGER PRIMARY KEY,
+    article_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    source TEXT,
+    link TEXT,
+    category TEXT,
+    published REAL NOT NULL,
+    first_edition TEXT NOT NULL,
+    last_edition TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category, published);
+CREATE TABLE IF NOT EXISTS editions (
+    id TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, source, content='articles', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary, source) VALUES (new.rowid, new.title, new.summary, new.source);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary, source)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.source);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, summary, source ON articles
+WHEN old.title IS NOT new.title OR old.summary IS NOT new.summary OR old.source IS NOT new.source BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary, source)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.source);
+    INSERT INTO articles_fts (rowid, title, summary, source) VALUES (new.rowid, new.title, new.summary, new.source);
+END;
+"""
+
+# Title matches count most, then the summary, then the outlet name
+RANK = 'bm25(articles_fts, 10.0, 1.0, 0.5)'
+
+QUERY_TERM = re.compile(r'\w+\*?', re.UNICODE)
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query matching every word, with trailing * for prefixes"""
+    # Each word is quoted, so FTS5 operators and punctuation in user input
+    # can never make the query invalid
+    terms = []
+    for term in QUERY_TERM.findall(query):
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return ' '.join(terms)
+
+
+def parse_date(value, end_of_day=False):
+    """Return the UTC epoch seconds of an ISO date or date-time, or None"""
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    # A bare date as the end of a range includes that whole day
+    if end_of_day and len(value) == 10:
+        moment += timedelta(days=1)
+    return moment.timestamp()
+
+
+def entry_timestamp(entry, edition_time):
+    """Return the feed publication time of a document entry, or the edition's time"""
+    if entry.get('published'):
+        try:
+            return calendar.timegm(time.strptime(entry['published'], '%Y-%m-%dT%H:%M:%SZ'))
+        except ValueError:
+            pass
+    return edition_time
+
+
+class SearchIndex:
+    """SQLite FTS5 index of published articles, one row per article however often it was published"""
+
+    # Every call opens its own connection, so the web app can search from
+    # any thread while the generator adds editions; WAL keeps readers from
+    # waiting on the writer.
+
+    def __init__(self, path=None):
+        self.path = path or SETTINGS.get('search_index_path', 'cache/search.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def count(self):
+        """Return the number of indexed articles"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def add_edition(self, document):
+        """Index the articles of an edition document; return how many were new"""
+        edition_time = datetime.fromisoformat(document['generated_at']).timestamp()
+        rows = []
+        for section in document['sections']:
+            for entry in section['articles']:
+                rows.append({
+                    'article_id': entry.get('id') or entry['link'] or entry['title'],
+                    'title': entry['title'],
+                    'summary': entry['summary'],
+                    'source': entry.get('source'),
+                    'link': entry.get('link'),
+                    'category': section['category'],
+                    'published': entry_timestamp(entry, edition_time),
+                    'edition': document['id']
+                })
+
+        with closing(self._connect()) as conn, conn:
+            if conn.execute("SELECT 1 FROM editions WHERE id = ?", (document['id'],)).fetchone():
+                return 0
+            before = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            # A story carried over from an earlier edition keeps its row and
+            # only moves its last edition, and its text when the summary changed
+            conn.executemany("""
+                INSERT INTO articles (article_id, title, summary, source, link, category, published,
+                                      first_edition, last_edition)
+                VALUES (:article_id, :title, :summary, :source, :link, :category, :published, :edition, :edition)
+                ON CONFLICT(article_id) DO UPDATE SET
+                    title = excluded.title,
+                    summary = excluded.summary,
+                    category = excluded.category,
+                    last_edition = excluded.last_edition
+            """, rows)
+            new = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] - before
+            conn.execute("INSERT INTO editions (id, indexed_at) VALUES (?, ?)", (document['id'], time.time()))
+        logger.info(f"Indexed edition {document['id']} ({len(rows)} articles, {new} new)")
+        return new
+
+    def backfill(self, archive_path=None):
+        """Index the JSON documents of editions published before the index existed"""
+        archive_path = archive_path or SETTINGS.get('archive_path', 'archive/')
+        if not os.path.isdir(archive_path):
+            return 0
+        indexed = 0
+        for filename in sorted(os.listdir(archive_path)):
+            # Only edition documents, not the profile or story pool published beside them
+            if filename == f"world_summary_{edition_id(filename)}.json":
+                try:
+                    with open(os.path.join(archive_path, filename), 'r', encoding='utf-8') as f:
+                        self.add_edition(json.load(f))
+                    indexed += 1
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable edition {filename}: {str(e)}")
+        return indexed
+
+    def search(self, query, date_from=None, date_to=None, category=None, limit=20, offset=0):
+        """Return (matching articles best first, total matches) for a free-text query"""
+        expression = match_expression(query)
+        if not expression:
+            return [], 0
+
+        # The matches are collected from the full-text index first. Left to
+        # itself the planner may walk the category or date index instead and
+        # re-run the MATCH for every row in the range, which is far slower.
+        conditions = []
+        params = [expression]
+        if date_from is not None:
+            conditions.append("a.published >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("a.published < ?")
+            params.append(date_to)
+        if category:
+            conditions.append("a.category = ?")
+            params.append(category)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"""
+                WITH matches AS MATERIALIZED (
+                    SELECT rowid, {RANK} AS score FROM articles_fts WHERE articles_fts MATCH ?
+                )
+                SELECT a.rowid, a.article_id, a.title, a.source, a.link, a.category, a.published,
+                       a.first_edition, a.last_edition, COUNT(*) OVER () AS total
+                FROM matches JOIN articles a ON a.rowid = matches.rowid
+                {where}
+                ORDER BY matches.score
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset]).fetchall()
+            if rows:
+                total = rows[0]['total']
+            elif offset:
+                total = conn.execute(f"""
+                    SELECT COUNT(*) FROM articles a
+                    WHERE a.rowid IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)
+                    {where.replace('WHERE', 'AND', 1)}
+                """, params).fetchone()[0]
+            else:
+                total = 0
+
+            # Snippets only for the page being returned
+            snippets = {}
+            if rows:
+                rowids = [row['rowid'] for row in rows]
+                snippets = dict(conn.execute(f"""
+                    SELECT rowid, snippet(articles_fts, 1, '', '', '...', 32) FROM articles_fts
+                    WHERE articles_fts MATCH ? AND rowid IN ({', '.join('?' * len(rowids))})
+                """, [expression] + rowids).fetchall())
+
+        results = []
+        for row in rows:
+            result = {key: row[key] for key in row.keys() if key not in ('rowid', 'total')}
+            result['published'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(row['published']))
+            result['snippet'] = snippets.get(row['rowid'], '')
+            results.append(result)
+        return results, total
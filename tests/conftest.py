@@ -0,0 +1,41 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Slow News</title>
+<item><title>A story</title><link>https://example.com/story</link><guid>story-1</guid>
+<description>Something happened.</description></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def slow_server():
+    """Local feed server answering every path after a short delay; returns a function making feed URLs"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(0.2)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(FEED)))
+            self.end_headers()
+            self.wfile.write(FEED)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield lambda path: f"http://{host}:{port}{path}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,50 @@
+"""
+Tests for the web application's API endpoints
+"""
+
+import importlib
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The app opens its stores relative to the working directory when imported
+    monkeypatch.chdir(tmp_path)
+    app = importlib.import_module('app')
+    monkeypatch.setattr(app, '_profile', {'path': None, 'snapshot': None})
+    return app, app.app.test_client()
+
+
+def publish_pointer(profile_path):
+    os.makedirs('cache', exist_ok=True)
+    with open('cache/current.json', 'w', encoding='utf-8') as f:
+        json.dump({'id': '20260101_120000', 'generated_at': '2026-01-01T12:00:00', 'files': {},
+                   'profile': profile_path}, f)
+
+
+def test_metrics_without_a_published_edition(client):
+    app, client = client
+    response = client.get('/api/metrics')
+
+    assert response.status_code == 200
+    assert 'worldsummarize_last_run_' not in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('profile', [None, 'not json'])
+def test_metrics_skip_a_missing_or_corrupt_run_profile(client, profile):
+    app, client = client
+    if profile is not None:
+        with open('profile.json', 'w', encoding='utf-8') as f:
+            f.write(profile)
+    publish_pointer('profile.json')
+    # A request whose counters the export should still carry
+    client.get('/api/status')
+
+    response = client.get('/api/metrics')
+
+    assert response.status_code == 200
+    assert 'http_requests_total' in response.get_data(as_text=True)
+    assert 'worldsummarize_last_run_' not in response.get_data(as_text=True)
@@ -0,0 +1,144 @@
+"""
+Tests for the archive retention tiers and compaction in archive_store
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive_catalog import ArchiveCatalog
+from archive_store import EDITION_FILES, EditionStore, enforce_retention, retained
+from config import SETTINGS
+from document import build_document
+from publisher import publish_edition
+
+NOW = datetime(2026, 6, 17, 12, 0, 0)  # a Wednesday
+
+
+@pytest.fixture
+def tiers(monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'archive_hourly_days', 2)
+    monkeypatch.setitem(SETTINGS, 'archive_daily_days', 30)
+    monkeypatch.setitem(SETTINGS, 'archive_weekly_weeks', 52)
+    monkeypatch.setitem(SETTINGS, 'archive_keep_files', 2)
+
+
+def entry(moment):
+    return {'filename': f"world_summary_{moment.strftime('%Y%m%d_%H%M%S')}.pdf",
+            'timestamp': moment.isoformat(), 'size': 1}
+
+
+def names(*moments):
+    return {entry(moment)['filename'] for moment in moments}
+
+
+def test_hourly_tier_keeps_everything_up_to_its_boundary(tiers):
+    inside = NOW - timedelta(days=2)
+    recent = [NOW - timedelta(hours=hours) for hours in range(48)]
+    assert retained([entry(moment) for moment in recent + [inside]], NOW) == names(*recent, inside)
+
+
+def test_daily_tier_keeps_the_newest_edition_of_each_day(tiers):
+    late = NOW - timedelta(days=5, hours=1)
+    early = late - timedelta(hours=3)
+    other_day = NOW - timedelta(days=6)
+    assert retained([entry(early), entry(late), entry(other_day)], NOW) == names(late, other_day)
+
+
+def test_daily_tier_boundary_falls_back_to_weekly(tiers):
+    # Two editions of one ISO week, just past the daily tier: only the newer survives
+    newer = NOW - timedelta(days=30, seconds=1)
+    older = newer - timedelta(hours=2)
+    assert newer.isocalendar()[:2] == older.isocalendar()[:2]
+    assert retained([entry(newer), entry(older)], NOW) == names(newer)
+
+
+def test_weekly_tier_drops_editions_older_than_its_limit(tiers):
+    kept = NOW - timedelta(weeks=52)
+    dropped = NOW - timedelta(weeks=52, seconds=1)
+    assert retained([entry(kept), entry(dropped)], NOW) == names(kept)
+
+
+def test_weekly_tier_of_zero_keeps_weeks_forever(tiers, monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'archive_weekly_weeks', 0)
+    ancient = NOW - timedelta(weeks=500)
+    assert retained([entry(ancient)], NOW) == names(ancient)
+
+
+def publish(archive, moment, store=None):
+    """Write every file of an archived edition and return its id"""
+    edition = moment.strftime('%Y%m%d_%H%M%S')
+    for suffix in EDITION_FILES:
+        path = os.path.join(archive, f"world_summary_{edition}.{suffix}")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('x')
+        os.utime(path, (moment.timestamp(), moment.timestamp()))
+    if store is not None:
+        store.add({'id': edition, 'generated_at': moment.isoformat(),
+                   'sections': [{'category': 'World News', 'articles': [{'title': edition, 'summary': 's'}]}]})
+    return edition
+
+
+def files_of(archive, edition):
+    return sorted(name for name in os.listdir(archive) if name.startswith(f"world_summary_{edition}."))
+
+
+def test_enforce_retention_drops_and_compacts(tiers, tmp_path):
+    archive = str(tmp_path)
+    store = EditionStore(os.path.join(archive, 'editions.db'))
+    newest = publish(archive, NOW - timedelta(hours=1), store)
+    second = publish(archive, NOW - timedelta(hours=2), store)
+    third = publish(archive, NOW - timedelta(hours=3), store)
+    # Same day as the next one but older, beyond the hourly tier
+    superseded = publish(archive, NOW - timedelta(days=5, hours=4), store)
+    daily = publish(archive, NOW - timedelta(days=5), store)
+    catalog = ArchiveCatalog(os.path.join(archive, 'catalog.json'), archive)
+    catalog.seed()
+
+    assert enforce_retention(catalog, store, NOW) == (1, 2)
+
+    # The two newest keep their files; older survivors live only in the store
+    assert len(files_of(archive, newest)) == len(EDITION_FILES)
+    assert len(files_of(archive, second)) == len(EDITION_FILES)
+    assert files_of(archive, third) == [] and store.has(third)
+    assert files_of(archive, daily) == [] and store.has(daily)
+    assert store.get(daily)['sections'][0]['articles'][0]['title'] == daily
+    # The superseded edition is gone everywhere
+    assert files_of(archive, superseded) == [] and not store.has(superseded)
+    assert {item['filename'] for item in catalog.all()} == {
+        f"world_summary_{edition}.pdf" for edition in (newest, second, third, daily)}
+
+
+def test_enforce_retention_keeps_files_it_cannot_store(tiers, tmp_path):
+    archive = str(tmp_path)
+    store = EditionStore(os.path.join(archive, 'editions.db'))
+    for hours in (1, 2):
+        publish(archive, NOW - timedelta(hours=hours), store)
+    # Archived without a stored document or a readable JSON document
+    orphan = publish(archive, NOW - timedelta(hours=3))
+    catalog = ArchiveCatalog(os.path.join(archive, 'catalog.json'), archive)
+    catalog.seed()
+
+    assert enforce_retention(catalog, store, NOW) == (0, 0)
+    assert len(files_of(archive, orphan)) == len(EDITION_FILES)
+
+
+def test_seeding_leaves_out_the_live_edition(tmp_path, monkeypatch):
+    archive = str(tmp_path / 'archive')
+    os.makedirs(archive)
+    monkeypatch.setitem(SETTINGS, 'archive_path', archive)
+    monkeypatch.setitem(SETTINGS, 'archive_catalog_path', os.path.join(archive, 'catalog.json'))
+    monkeypatch.setitem(SETTINGS, 'edition_store_path', os.path.join(archive, 'editions.db'))
+    monkeypatch.setitem(SETTINGS, 'current_edition_path', str(tmp_path / 'current.json'))
+    monkeypatch.setitem(SETTINGS, 'search_index_path', str(tmp_path / 'search.db'))
+    for output_format in ('pdf', 'html', 'json'):
+        monkeypatch.setitem(SETTINGS, f'{output_format}_output_path', str(tmp_path / f'world_summary.{output_format}'))
+    # An edition archived before the catalog existed
+    older = publish(archive, datetime.now() - timedelta(hours=2))
+
+    document = build_document({'World News': [{'title': 'Story', 'digest': 'Text.', 'source': 'Example'}]})
+    publish_edition(document)
+
+    catalog = ArchiveCatalog()
+    assert [item['filename'] for item in catalog.all()] == [f"world_summary_{older}.pdf"]
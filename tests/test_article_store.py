@@ -0,0 +1,81 @@
+"""
+Tests for the article store and delta-only processing across runs
+"""
+
+import pytest
+
+import worldsummerize
+from article_store import ArticleStore, article_identity, content_hash
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.db'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def cleaned(monkeypatch):
+    """Record every text the cleaner is asked to clean"""
+    texts = []
+
+    def clean_batch(batch):
+        texts.extend(batch)
+        return [' '.join(text.replace('<b>', '').replace('</b>', '').split()) for text in batch]
+    monkeypatch.setattr(worldsummerize, 'clean_batch', clean_batch)
+    return texts
+
+
+def parsed(guid, title, summary):
+    """An article as parse_rss_feed returns it"""
+    article = {'id': article_identity({'id': guid}), 'title': title, 'summary': summary,
+               'link': f"https://example.com/{guid}", 'published': None, 'source': 'Example News'}
+    article['content_hash'] = content_hash(title, summary)
+    return article
+
+
+def run(store, articles):
+    """One run's clean and classify stages"""
+    return list(worldsummerize.classify_stage(iter(worldsummerize.clean_articles(articles, store)), store))
+
+
+def test_article_identity_prefers_guid_then_link_then_title():
+    assert article_identity({'id': 'a', 'link': 'b'}) == article_identity({'id': 'a', 'link': 'c'})
+    assert article_identity({'link': 'b', 'title': 'x'}) == article_identity({'link': 'b', 'title': 'y'})
+    assert article_identity({'title': 'x'}, 'feed-1') != article_identity({'title': 'x'}, 'feed-2')
+
+
+def test_unchanged_articles_are_not_processed_again(store, cleaned, monkeypatch):
+    first = [parsed('a', 'Markets <b>rally</b>', 'Stocks rose.'), parsed('b', 'Election day', 'Polls open.')]
+    run(store, first)
+    assert len(cleaned) == 4
+    stored = store.lookup([article['id'] for article in first])
+    assert stored[first[0]['id']]['title'] == 'Markets rally'
+
+    classified = []
+    original = worldsummerize.classify_batch
+    monkeypatch.setattr(worldsummerize, 'classify_batch',
+                        lambda articles: classified.extend(articles) or original(articles))
+    cleaned.clear()
+    second = [parsed('a', 'Markets <b>rally</b>', 'Stocks rose.'), parsed('b', 'Election day', 'Polls open.')]
+    run(store, second)
+
+    # Both came back from the store: cleaned text and category reused as they were
+    assert cleaned == []
+    assert classified == []
+    assert second[0]['title'] == 'Markets rally'
+    assert second[1]['category'] == stored[second[1]['id']]['category']
+    assert store.lookup([second[0]['id']])[second[0]['id']]['last_seen'] >= stored[first[0]['id']]['last_seen']
+
+
+def test_changed_articles_are_processed_again(store, cleaned):
+    run(store, [parsed('a', 'Markets rally', 'Stocks rose.')])
+    cleaned.clear()
+
+    updated = parsed('a', 'Markets <b>slump</b>', 'Stocks fell.')
+    run(store, [updated, parsed('c', 'New story', 'Fresh text.')])
+
+    assert cleaned == ['Markets <b>slump</b>', 'Stocks fell.', 'New story', 'Fresh text.']
+    row = store.lookup([updated['id']])[updated['id']]
+    assert (row['title'], row['content_hash']) == ('Markets slump', updated['content_hash'])
@@ -0,0 +1,56 @@
+"""
+Tests for keyword matching and weighted scoring in categorizer
+"""
+
+from categorizer import FALLBACK_CATEGORY, WeightedClassifier, tokenize
+
+TAXONOMY = {
+    'Technology': {'ai': 3, 'meta': 2, 'artificial intelligence': 3},
+    'Business': {'market': 2, 's&p': 3, 'tax': 1},
+}
+
+
+def matched_terms(text):
+    classifier = WeightedClassifier(TAXONOMY)
+    return sorted(classifier.term_counts(text).items())
+
+
+def test_tokenize_splits_on_punctuation_and_typographic_quotes():
+    words = tokenize('S&P’s rally — "AI"-driven, says Meta.')
+    assert words == ['s&p', 's', 'rally', 'ai', 'driven', 'says', 'meta']
+
+
+def test_terms_match_whole_words_only():
+    assert matched_terms('The minister said the metal plant was sold') == []
+    assert matched_terms('AI rules, said Meta') == [(0, 1), (1, 1)]
+
+
+def test_phrases_and_plurals_match():
+    classifier = WeightedClassifier(TAXONOMY)
+    counts = classifier.term_counts('Artificial intelligence lifts markets; taxes fall. Artificial intelligences too.')
+    phrase, market, tax = (classifier.phrases['artificial intelligence'], classifier.words['market'],
+                           classifier.words['tax'])
+    assert counts == {phrase: 2, market: 1, tax: 1}
+
+
+def test_headline_terms_are_weighted_and_every_matching_category_is_scored():
+    classifier = WeightedClassifier(TAXONOMY, title_weight=2)
+    [result] = classifier.classify_batch([{'title': 'Meta stock', 'summary': 'The market and AI.'}])
+
+    assert result['scores'] == {'Technology': 2 * 2 + 3, 'Business': 2}
+    assert result['category'] == 'Technology'
+    assert result['relevance'] == 7
+
+
+def test_category_order_breaks_ties():
+    classifier = WeightedClassifier(TAXONOMY)
+    [result] = classifier.classify_batch([{'title': 'Meta', 'summary': 'The market.'}])
+    assert result['category'] == 'Technology'
+
+
+def test_articles_below_the_minimum_score_fall_back():
+    classifier = WeightedClassifier(TAXONOMY, min_score=2)
+    [weak, unmatched] = classifier.classify_batch([{'title': 'A new tax', 'summary': ''},
+                                                   {'title': 'Weather', 'summary': 'Sunny.'}])
+    assert weak == {'category': FALLBACK_CATEGORY, 'relevance': 0, 'scores': {}}
+    assert unmatched == weak
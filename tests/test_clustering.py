@@ -0,0 +1,49 @@
+"""
+Tests for near-duplicate story clustering
+"""
+
+import pytest
+
+from article_store import content_hash
+from clustering import StoryIndex, minhash, shingles
+
+STORY = ('Officials said talks between the two governments would resume next week after a breakthrough '
+         'on trade tariffs and border controls')
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = StoryIndex(str(tmp_path / 'stories.db'))
+    yield index
+    index.close()
+
+
+def article(article_id, title, summary=''):
+    return {'id': article_id, 'title': title, 'summary': summary, 'content_hash': content_hash(title, summary)}
+
+
+def test_texts_shorter_than_a_shingle_have_no_signature():
+    assert shingles('') == set() and minhash('') is None
+    assert shingles('Update') == set() and minhash('Update') is None
+    assert len(minhash('Trade talks')) == 64
+
+
+def test_near_duplicates_share_a_cluster(index):
+    first = article('a', 'Trade talks to resume', STORY)
+    second = article('b', 'Trade talks set to resume', STORY + ' on Monday')
+    other = article('c', 'Storm hits coast', 'A powerful storm brought flooding and power cuts to coastal towns')
+    index.assign([first, second, other])
+
+    assert second['cluster_id'] == first['cluster_id'] == 'a'
+    assert other['cluster_id'] == 'c'
+
+
+def test_articles_without_text_are_stories_of_their_own(index):
+    untitled = [article(f"untitled-{n}", 'No title') for n in range(3)] + [article('empty', '')]
+    index.assign(untitled)
+
+    assert [item['cluster_id'] for item in untitled] == ['untitled-0', 'untitled-1', 'untitled-2', 'empty']
+    # Nothing was indexed for them, so a later article cannot join them either
+    later = article('later', 'No title')
+    index.assign([later])
+    assert later['cluster_id'] == 'later'
@@ -0,0 +1,72 @@
+"""
+Tests for revalidating crawled article pages in enrichment
+"""
+
+import time
+
+import pytest
+
+import enrichment
+from config import NEWS_SOURCES, SETTINGS
+from enrichment import PageCache, enrich_articles
+from metrics import REGISTRY
+
+LINK = 'https://www.example.com/news/story'
+BODY = 'Firefighters contained the warehouse blaze before dawn, officials said on Monday morning.'
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'enrichment_cache_dir', str(tmp_path))
+    monkeypatch.setitem(NEWS_SOURCES, 'rss_feeds', ['https://feeds.example.com/rss'])
+    cache = PageCache()
+    # Cached two days ago, so it is revalidated with its validators
+    entry = cache.put(LINK, BODY, {'ETag': '"page-1"', 'Last-Modified': 'Mon, 01 Jun 2026 10:00:00 GMT'})
+    entry['fetched_at'] = time.time() - 2 * 86400
+    enrichment.write_json_atomic(cache._file(LINK), entry)
+    return cache
+
+
+def answer(monkeypatch, status, headers):
+    requested = []
+
+    def crawl_pages(urls, request_headers=None):
+        for url in urls:
+            requested.append(request_headers.get(url))
+            yield {'url': url, 'status': status, 'content': b'', 'headers': headers, 'elapsed': 0.01,
+                   'error': None}
+    monkeypatch.setattr(enrichment, 'crawl_pages', crawl_pages)
+    return requested
+
+
+def test_not_modified_keeps_validators_the_response_leaves_out(cache, monkeypatch):
+    requested = answer(monkeypatch, 304, {'Date': 'Wed, 03 Jun 2026 10:00:00 GMT'})
+    article = {'link': LINK, 'summary': 'Fire downtown.'}
+    enrich_articles([article])
+
+    assert requested == [{'If-None-Match': '"page-1"', 'If-Modified-Since': 'Mon, 01 Jun 2026 10:00:00 GMT'}]
+    assert article['body'] == BODY
+    entry = cache.get(LINK)
+    assert (entry['etag'], entry['last_modified']) == ('"page-1"', 'Mon, 01 Jun 2026 10:00:00 GMT')
+    assert entry['body'] == BODY and cache.is_fresh(entry)
+
+
+def test_not_modified_takes_new_validators_the_response_sends(cache, monkeypatch):
+    answer(monkeypatch, 304, {'ETag': '"page-2"'})
+    enrich_articles([{'link': LINK, 'summary': 'Fire downtown.'}])
+
+    entry = cache.get(LINK)
+    assert (entry['etag'], entry['last_modified']) == ('"page-2"', 'Mon, 01 Jun 2026 10:00:00 GMT')
+
+
+def test_page_downloads_are_not_counted_as_feed_downloads(monkeypatch):
+    robots = enrichment.RobotFileParser()
+    robots.allow_all = True
+    monkeypatch.setattr(enrichment, 'robots_parser', lambda url, deadline=None: robots)
+    REGISTRY.reset()
+    # Nothing listens on the discard port, so the download fails at once
+    result = enrichment.fetch_page('http://127.0.0.1:9/story', time.monotonic() + 2)
+
+    assert result['error']
+    assert '127.0.0.1:9' in REGISTRY.totals('page_fetch_seconds', 'host')
+    assert REGISTRY.totals('fetch_seconds', 'host') == {}
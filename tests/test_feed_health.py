@@ -0,0 +1,59 @@
+"""
+Tests for feed health tracking and the circuit breaker
+"""
+
+import pytest
+
+from article_store import ArticleStore
+from config import SETTINGS
+from feed_cache import FeedCache
+from feed_health import CLOSED, OPEN, FeedHealth
+from worldsummerize import fetch_stage
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'cache_dir', str(tmp_path))
+    monkeypatch.setitem(SETTINGS, 'clean_workers', 1)
+    monkeypatch.setitem(SETTINGS, 'breaker_failures', 2)
+    store = ArticleStore(str(tmp_path / 'articles.db'))
+    yield FeedCache(), store
+    store.close()
+
+
+def error(url):
+    return {'url': url, 'status': None, 'content': None, 'headers': {}, 'elapsed': 1.0, 'error': 'timed out',
+            'skipped': False}
+
+
+def test_breaker_opens_after_consecutive_failures_and_closes_on_success(state):
+    health = FeedHealth()
+    url = 'https://example.com/feed.xml'
+    health.record_fetch(url, error(url))
+    assert health.plan([url]) == ([url], [], [])
+    health.record_fetch(url, error(url))
+    assert health.sources[url]['state'] == OPEN
+    assert health.plan([url]) == ([], [], [url])
+
+    health.sources[url]['retry_at'] = 0
+    assert health.plan([url]) == ([], [url], [])
+    health.record_parse(url, 5)
+    assert health.sources[url]['state'] == CLOSED
+
+
+def test_feeds_skipped_for_the_run_budget_do_not_trip_the_breaker(state, slow_server, monkeypatch):
+    feed_cache, store = state
+    monkeypatch.setitem(SETTINGS, 'fetch_workers', 2)
+    monkeypatch.setitem(SETTINGS, 'fetch_deadline_seconds', 0.3)
+    urls = [slow_server(f"/feed-{n}.xml") for n in range(10)]
+    health = FeedHealth()
+
+    for _ in range(3):
+        for _ in fetch_stage(urls, feed_cache, store, health=health):
+            pass
+
+    # The tail of the list never got a download of its own in any run
+    assert all(health.sources.get(url, {}).get('state', CLOSED) == CLOSED for url in urls)
+    assert all(source['errors'] == 0 for source in health.sources.values())
+    assert health.sources[urls[0]]['polls'] == 3
+    assert urls[-1] not in health.sources
@@ -0,0 +1,101 @@
+"""
+Tests that articles published by poll_feeds from the feed cache are cleaned exactly once
+"""
+
+import pytest
+
+import worldsummerize
+from config import NEWS_SOURCES, SETTINGS
+from feed_cache import FeedCache
+from feed_health import FeedHealth
+
+FEED_URL = 'https://example.com/feed.xml'
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Example News</title>
+<item>
+<title>Parsers and markup</title>
+<link>https://example.com/parsers</link>
+<guid>parsers-1</guid>
+<description>Engineers say &amp;lt;script&amp;gt; tags and x &amp;lt; y comparisons trip up parsers.</description>
+</item>
+</channel></rss>"""
+
+CLEANED = 'Engineers say <script> tags and x < y comparisons trip up parsers.'
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setitem(NEWS_SOURCES, 'rss_feeds', [FEED_URL])
+    monkeypatch.setitem(SETTINGS, 'cache_dir', str(tmp_path))
+    monkeypatch.setitem(SETTINGS, 'article_store_path', str(tmp_path / 'articles.db'))
+    monkeypatch.setitem(SETTINGS, 'fetch_article_bodies', False)
+    monkeypatch.setitem(SETTINGS, 'publish_min_new_articles', 1)
+    monkeypatch.setitem(SETTINGS, 'clean_workers', 1)
+    published = []
+    monkeypatch.setattr(worldsummerize, 'build_document', lambda categorized: categorized)
+    monkeypatch.setattr(worldsummerize, 'publish_edition',
+                        lambda categorized, registry, pool: published.append(categorized))
+    return published
+
+
+def serve(monkeypatch, status, content=b'', error=None):
+    def fetch_feeds(urls, request_headers=None, probe_urls=()):
+        for url in urls:
+            yield {'url': url, 'status': status, 'content': content, 'elapsed': 0.01, 'error': error,
+                   'headers': {'Content-Type': 'application/rss+xml', 'ETag': '"v1"'}, 'skipped': False}
+    monkeypatch.setattr(worldsummerize, 'fetch_feeds', fetch_feeds)
+
+
+def published_summaries(edition):
+    return [article['summary'] for articles in edition.values() for article in articles]
+
+
+def test_polled_articles_are_published_cleaned_once(pipeline, monkeypatch):
+    serve(monkeypatch, 200, FEED)
+    worldsummerize.poll_feeds()
+
+    assert len(pipeline) == 1
+    assert published_summaries(pipeline[0]) == [CLEANED]
+
+
+def test_feed_cache_keeps_raw_articles_for_304_responses(pipeline, monkeypatch):
+    serve(monkeypatch, 200, FEED)
+    worldsummerize.poll_feeds()
+    raw = FeedCache().stored_articles(FEED_URL)
+    assert '&lt;script&gt;' in raw[0]['summary']
+
+    # A full run revalidates the feed and publishes it from the cache again
+    serve(monkeypatch, 304)
+    worldsummerize.scrape_news()
+
+    assert published_summaries(pipeline[-1]) == [CLEANED]
+
+
+def test_failed_download_keeps_the_feeds_cached_articles(pipeline, monkeypatch):
+    serve(monkeypatch, 200, FEED)
+    worldsummerize.poll_feeds()
+
+    serve(monkeypatch, 503, error='HTTP 503')
+    worldsummerize.scrape_news()
+
+    assert published_summaries(pipeline[-1]) == [CLEANED]
+
+
+def test_feed_behind_an_open_breaker_keeps_its_cached_articles(pipeline, monkeypatch):
+    serve(monkeypatch, 200, FEED)
+    worldsummerize.poll_feeds()
+    monkeypatch.setitem(SETTINGS, 'breaker_failures', 1)
+    health = FeedHealth()
+    health.record_fetch(FEED_URL, {'error': 'timed out', 'status': None, 'elapsed': 10.0})
+    health.save()
+
+    requested = []
+    serve(monkeypatch, 200, FEED)
+    fetch_feeds = worldsummerize.fetch_feeds
+    monkeypatch.setattr(worldsummerize, 'fetch_feeds',
+                        lambda urls, *args: requested.extend(urls) or fetch_feeds(urls, *args))
+    worldsummerize.scrape_news()
+
+    assert requested == []
+    assert published_summaries(pipeline[-1]) == [CLEANED]
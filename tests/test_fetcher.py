@@ -0,0 +1,24 @@
+"""
+Tests for the concurrent feed fetcher
+"""
+
+from config import SETTINGS
+from fetcher import fetch_feeds
+
+
+def test_feeds_past_the_budget_are_skipped_not_timed_out(slow_server, monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'fetch_workers', 2)
+    monkeypatch.setitem(SETTINGS, 'fetch_deadline_seconds', 0.3)
+    monkeypatch.setitem(SETTINGS, 'fetch_timeout_seconds', 5)
+    urls = [slow_server(f"/feed-{n}.xml") for n in range(12)]
+
+    results = list(fetch_feeds(urls))
+
+    assert sorted(result['url'] for result in results) == sorted(urls)
+    fetched = [result for result in results if not result['skipped']]
+    skipped = [result for result in results if result['skipped']]
+    # Every feed that was started had its full timeout and came back
+    assert fetched and all(result['status'] == 200 and result['error'] is None for result in fetched)
+    assert skipped and all(result['error'] == 'fetch budget exhausted' for result in skipped)
+    # The feeds at the end of the list are the ones left out
+    assert {result['url'] for result in skipped} == set(urls[len(fetched):])
@@ -0,0 +1,92 @@
+"""
+Tests for line breaking and pagination in layout
+"""
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from config import PDF_SETTINGS
+from document import build_document
+from layout import break_lines, get_metrics, paginate, truncate_lines
+from renderers import layout_items
+
+WIDTH, HEIGHT = A4
+TOP = HEIGHT - PDF_SETTINGS['margin_top']
+BOTTOM = PDF_SETTINGS['margin_bottom'] + 40
+TEXT_WIDTH = WIDTH - PDF_SETTINGS['margin_left'] - PDF_SETTINGS['margin_right']
+
+SUMMARY = ' '.join(['Officials said talks would continue after a week of meetings in the capital.'] * 6)
+
+
+def article(number):
+    return {'type': 'article', 'title': f"Story {number}", 'summary': SUMMARY, 'source': 'Example News'}
+
+
+def body_lines(page):
+    """Draw operations of a page other than its page number"""
+    return [operation for operation in page if not operation[4].startswith('Page ')]
+
+
+def test_break_lines_fits_every_line_within_the_width():
+    body = get_metrics('Helvetica', 10)
+    lines = break_lines([(body, SUMMARY + ' ' + 'x' * 400)], 200)
+    for line in lines:
+        for metrics, text, x in line:
+            assert x + stringWidth(text, metrics.font_name, metrics.size) <= 200 + 1e-6
+    assert ' '.join(text for line in lines for _, text, _ in line).replace(' ', '') == \
+        (SUMMARY + 'x' * 400).replace(' ', '')
+
+
+def test_truncate_lines_ends_the_last_kept_line_with_an_ellipsis():
+    body = get_metrics('Helvetica', 10)
+    lines = truncate_lines(break_lines([(body, SUMMARY)], 150), 3, 150)
+    assert len(lines) == 3
+    assert lines[-1][-1][1].endswith('...')
+
+
+def test_articles_overflow_onto_the_next_page():
+    pages = list(paginate([{'type': 'category', 'text': 'WORLD'}] + [article(n) for n in range(12)],
+                          A4, HEIGHT - 250))
+
+    assert len(pages) > 1
+    assert [page[-1][4] for page in pages] == [f"Page {n}" for n in range(1, len(pages) + 1)]
+    for page in pages:
+        assert all(BOTTOM <= y <= TOP for _, _, _, y, _ in body_lines(page))
+    # The second page starts at the top margin with the story that did not fit
+    assert body_lines(pages[1])[0][3] == TOP
+    titles = [text for page in pages for _, _, _, _, text in body_lines(page) if text.startswith('Story ')]
+    assert [title.split(':')[0] for title in titles] == [f"Story {n}" for n in range(12)]
+
+
+def test_pagination_stops_at_the_last_page():
+    items = [article(n) for n in range(200)]
+    pages = list(paginate(items, A4, HEIGHT - 250, max_pages=3))
+
+    assert len(pages) == 3
+    assert pages[-1][-1][4] == 'Page 3'
+    assert len(list(paginate(items, A4, HEIGHT - 250))) > 3
+
+
+def test_heading_moves_to_the_next_page_with_its_first_story():
+    # The heading only just fits above the bottom margin, so it is carried over
+    pages = list(paginate([{'type': 'category', 'text': 'WORLD'}, article(0)], A4, BOTTOM + 30))
+
+    assert len(pages) == 2
+    assert body_lines(pages[0]) == []
+    assert body_lines(pages[1])[0][4] == 'WORLD'
+
+
+def test_empty_category_gets_no_heading():
+    document = build_document({'World': [{'title': 'Story 0', 'digest': SUMMARY, 'source': 'Example News'}],
+                               'Technology': []})
+    items = list(layout_items(document))
+
+    assert [item['text'] for item in items if item['type'] == 'category'] == ['WORLD']
+    pages = list(paginate(items, A4, HEIGHT - 250))
+    assert len(pages) == 1
+    assert 'TECHNOLOGY' not in [text for _, _, _, _, text in pages[0]]
+
+
+def test_empty_edition_is_one_numbered_page():
+    footer_x = (WIDTH - stringWidth('Page 1', 'Helvetica', 9)) / 2
+    assert list(paginate([], A4, HEIGHT - 250)) == [[('Helvetica', 9, footer_x, 30, 'Page 1')]]
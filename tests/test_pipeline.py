@@ -0,0 +1,60 @@
+"""
+Tests for grouping story clusters into the edition's categories
+"""
+
+from metrics import REGISTRY
+from worldsummerize import group_stage
+
+
+def story(cluster_id, relevance, source, category='World News'):
+    return {'cluster_id': cluster_id, 'relevance': relevance, 'source': source, 'category': category}
+
+
+def kept(categories, category='World News'):
+    return [(article['cluster_id'], article['source']) for article in categories[category]]
+
+
+def test_versions_of_a_story_collapse_into_the_first():
+    categories = group_stage(iter([story('a', 5, 'BBC'), story('a', 9, 'CNN'), story('a', 4, 'BBC')]), 10)
+
+    assert kept(categories) == [('a', 'BBC')]
+    assert categories['World News'][0]['also_reported_by'] == ['CNN']
+
+
+def test_most_relevant_stories_are_kept_earliest_first_among_equals():
+    categories = group_stage(iter([story('a', 1, 'BBC'), story('b', 3, 'BBC'), story('c', 3, 'CNN'),
+                                   story('d', 2, 'NPR')]), 2)
+    assert kept(categories) == [('b', 'BBC'), ('c', 'CNN')]
+
+
+def test_story_evicted_from_one_category_returns_with_another_version():
+    categories = group_stage(iter([
+        story('a', 1, 'BBC'),
+        story('b', 5, 'CNN'),
+        # Evicts a's first version
+        story('c', 4, 'NPR'),
+        # Another outlet's version of a, filed under a category with room
+        story('a', 3, 'Reuters', category='Politics'),
+    ]), 2)
+
+    assert kept(categories) == [('b', 'CNN'), ('c', 'NPR')]
+    assert kept(categories, 'Politics') == [('a', 'Reuters')]
+
+
+def test_story_that_returns_keeps_the_outlets_credited_to_it():
+    categories = group_stage(iter([
+        story('a', 1, 'BBC'),
+        story('a', 1, 'CNN'),
+        story('b', 5, 'NPR'),
+        story('c', 4, 'NPR'),
+        story('a', 3, 'Reuters', category='Politics'),
+        story('a', 2, 'AP'),
+    ]), 2)
+
+    assert kept(categories, 'Politics') == [('a', 'Reuters')]
+    assert categories['Politics'][0]['also_reported_by'] == ['BBC', 'CNN', 'AP']
+
+
+def test_stories_are_counted_once_however_often_they_return():
+    group_stage(iter([story('a', 1, 'BBC'), story('b', 5, 'CNN'), story('a', 0, 'AP'), story('a', 0, 'NPR')]), 1)
+    assert [gauge['value'] for gauge in REGISTRY.snapshot()['gauges'] if gauge['name'] == 'stories_collected'] == [2]
@@ -0,0 +1,38 @@
+"""
+Tests for the render cache in renderers
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import renderers
+from config import SETTINGS
+
+
+def test_concurrent_renders_keep_the_cache_bounded_and_its_byte_count_exact(monkeypatch):
+    monkeypatch.setattr(renderers, '_cache', OrderedDict())
+    monkeypatch.setattr(renderers, '_cache_bytes', 0)
+    monkeypatch.setitem(SETTINGS, 'render_cache_size', 3)
+
+    def render_document(document, output_format):
+        # Long enough for other threads to render the same edition meanwhile
+        time.sleep(0.001)
+        return document['id'].encode('utf-8') * 100
+    monkeypatch.setattr(renderers, 'render_document', render_document)
+
+    documents = [{'id': f"2026010{n}_120000"} for n in range(6)]
+
+    def worker(offset):
+        for i in range(60):
+            document = documents[(i + offset) % len(documents)]
+            assert renderers.render(document, 'json') == render_document(document, 'json')
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(renderers._cache) <= 3
+    assert renderers._cache_bytes == sum(len(output) for output in renderers._cache.values())
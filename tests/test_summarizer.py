@@ -0,0 +1,122 @@
+"""
+Tests for the summary builders: the batched lead summary against the sentence
+loop it replaced, and the extractive mode
+"""
+
+import random
+
+import summarizer
+from config import SETTINGS
+from summarizer import CONTEXT_TEMPLATE, TermStatistics, build_summary, extractive_summary, summarize_batch
+
+WORDS = ('the minister said talks would continue after a week of meetings while analysts warned '
+         'markets could react sharply to any change in policy across the region').split()
+
+
+def reference_summary(raw_summary, source):
+    """The per-article loop build_summary replaced, as it ran inside create_pdf"""
+    raw_summary = ' '.join(raw_summary.split())
+    sentences = raw_summary.replace('? ', '?|').replace('! ', '!|').replace('. ', '.|').split('|')
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    summary = ""
+    word_count = 0
+    for sentence in sentences:
+        sentence_words = len(sentence.split())
+        new_word_count = word_count + sentence_words
+        if word_count < 150:
+            summary += sentence + " "
+            word_count = new_word_count
+        elif word_count < 200 and new_word_count <= 250:
+            summary += sentence + " "
+            word_count = new_word_count
+        elif new_word_count <= 300:
+            summary += sentence + " "
+            word_count = new_word_count
+        else:
+            break
+
+    if word_count < 150:
+        context_sentences = CONTEXT_TEMPLATE.format(source=source).replace('. ', '.|').split('|')
+        for sentence in context_sentences:
+            sentence = sentence.strip()
+            if sentence:
+                sentence_words = len(sentence.split())
+                if word_count + sentence_words <= 300:
+                    summary += sentence + " "
+                    word_count += sentence_words
+                    if word_count >= 150:
+                        break
+
+    return summary.strip()
+
+
+def random_blurb(rng):
+    """A single-spaced blurb of random sentences, as the cleaner produces them"""
+    sentences = []
+    for _ in range(rng.randint(1, 40)):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 60))]
+        sentences.append(' '.join(words) + rng.choice('.?!'))
+    return ' '.join(sentences)
+
+
+def test_build_summary_matches_the_sentence_loop():
+    rng = random.Random(2026)
+    for _ in range(3000):
+        blurb = random_blurb(rng)
+        assert build_summary(blurb, 'BBC News') == reference_summary(blurb, 'BBC News'), blurb
+
+
+def test_extractive_summary_keeps_blurbs_of_short_sentences():
+    stats = TermStatistics()
+    stats.add('Fire downtown. Crews respond.')
+    assert extractive_summary('Fire downtown. Crews respond.', stats) == 'Fire downtown. Crews respond.'
+
+
+def test_extractive_summary_skips_fragments_next_to_full_sentences():
+    text = 'Breaking news. Crews fought a warehouse fire downtown overnight.'
+    stats = TermStatistics()
+    stats.add(text)
+    assert extractive_summary(text, stats) == 'Crews fought a warehouse fire downtown overnight.'
+
+
+def test_term_statistics_count_the_text_that_is_summarized(monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'summary_mode', 'extractive')
+    monkeypatch.setitem(SETTINGS, 'fetch_article_bodies', True)
+    monkeypatch.setattr(summarizer, '_cache', summarizer.OrderedDict())
+
+    def enrich_articles(articles):
+        for article in articles:
+            article['body'] = 'Firefighters contained the warehouse blaze before dawn.'
+    monkeypatch.setattr(summarizer, 'enrich_articles', enrich_articles)
+
+    article = {'title': 'Fire', 'summary': 'Fire downtown.', 'source': 'Example News'}
+    stats = TermStatistics()
+    stats.add(article['summary'])
+    summarize_batch([article], stats)
+
+    assert stats.documents == 1
+    assert stats.frequencies['warehouse'] == 1
+    assert stats.frequencies['downtown'] == 0
+    assert article['digest'] == 'Firefighters contained the warehouse blaze before dawn.'
+
+
+def test_extractive_summaries_are_not_reused_under_other_term_statistics(monkeypatch):
+    monkeypatch.setitem(SETTINGS, 'summary_mode', 'extractive')
+    monkeypatch.setitem(SETTINGS, 'fetch_article_bodies', False)
+    monkeypatch.setattr(summarizer, '_cache', summarizer.OrderedDict())
+    text = ('Storm damage closed the harbour road overnight. '
+            'Ferry services to the islands were cancelled until further notice.')
+
+    def summarize(corpus):
+        stats = TermStatistics()
+        for document in corpus:
+            stats.add(document)
+        article = {'title': 'Storm', 'summary': text, 'source': 'Example News'}
+        summarize_batch([article], stats)
+        return article['digest']
+
+    monkeypatch.setattr(summarizer, 'MAX_WORDS', 8)
+    # Storm news is everywhere in one run and ferries are in another, so the rarer topic wins
+    assert summarize([text] + ['storm damage harbour road'] * 5) == text.split('. ')[1]
+    assert summarize([text] + ['ferry services islands cancelled'] * 5) == text.split('. ')[0] + '.'
@@ -1,15 +1,23 @@
-import os
+import json
+import heapq
+import itertools
 import logging
-import requests
+import time
 import feedparser
-from bs4 import BeautifulSoup
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from datetime import datetime
-import textwrap
-from urllib.parse import urljoin, urlparse
-from config import NEWS_SOURCES, SETTINGS, PDF_SETTINGS
+from urllib.parse import urlparse
+from config import NEWS_SOURCES, SETTINGS, CATEGORIES
+from fetcher import fetch_url, fetch_feeds
+from feed_cache import FeedCache
+from feed_schedule import FeedSchedule
+from feed_health import FeedHealth
+from article_store import ArticleStore, article_identity, content_hash
+from cleaner import clean_batch, clean_workers
+from categorizer import CLASSIFIER_VERSION, FALLBACK_CATEGORY, classify_batch
+from clustering import StoryIndex
+from summarizer import TermStatistics, summarize_batch, summary_mode, summary_text
+from document import build_document
+from publisher import publish_edition
+from metrics import REGISTRY
 
 # Setup logging
 logging.basicConfig(
@@ -23,357 +31,369 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def scrape_rss_feed(url):
-    """Scrape RSS feed and return a list of articles"""
+@REGISTRY.timed('stage_seconds', stage='parse')
+def parse_rss_feed(url, content, headers=None, health=None):
+    """Parse downloaded RSS feed content and return a list of articles, or None if it is malformed"""
     try:
-        logger.info(f"Scraping RSS feed: {url}")
-        feed = feedparser.parse(url)
+        response_headers = {'content-location': url}
+        if headers:
+            response_headers.update({k.lower(): v for k, v in headers.items()})
+        feed = feedparser.parse(content, response_headers=response_headers)
         articles = []
         
         if feed.bozo:
             logger.warning(f"Failed to parse RSS feed properly: {url}")
-            return articles
+            if health is not None:
+                health.record_parse(url, 0, bozo=True)
+            return None
             
         for entry in feed.entries[:SETTINGS.get('max_articles_per_source', 5)]:
             article = {
+                'id': article_identity(entry, url),
                 'title': entry.get('title', 'No title'),
                 'summary': entry.get('summary', entry.get('description', '')),
                 'link': entry.get('link', ''),
                 'published': entry.get('published_parsed', None),
                 'source': feed.feed.get('title', urlparse(url).netloc)
             }
-            
-            # Clean up summary
-            if article['summary']:
-                soup = BeautifulSoup(article['summary'], 'html.parser')
-                article['summary'] = soup.get_text(strip=True)
-                
+            article['content_hash'] = content_hash(article['title'], article['summary'])
             articles.append(article)
             
         logger.info(f"Successfully scraped {len(articles)} articles from {url}")
+        if health is not None:
+            health.record_parse(url, len(feed.entries))
         return articles
         
     except Exception as e:
-        logger.error(f"Error scraping RSS feed {url}: {str(e)}")
+        logger.error(f"Error parsing RSS feed {url}: {str(e)}")
+        if health is not None:
+            health.record_parse(url, 0, bozo=True)
+        return None
+
+
+def scrape_rss_feed(url):
+    """Scrape RSS feed and return a list of articles"""
+    logger.info(f"Scraping RSS feed: {url}")
+    result = fetch_url(url)
+    if result['error']:
+        logger.error(f"Error scraping RSS feed {url}: {result['error']}")
         return []
+    return clean_articles(parse_rss_feed(url, result['content'], result['headers']) or [])
+
+
+@REGISTRY.timed('stage_seconds', stage='clean')
+def clean_articles(articles, store=None):
+    """Clean up article titles and summaries, reusing stored results for unchanged articles"""
+    known = store.lookup(article['id'] for article in articles) if store else {}
+    
+    pending = []
+    for article in articles:
+        row = known.get(article['id'])
+        if row is not None and row['content_hash'] == article['content_hash']:
+            # Already processed in an earlier run
+            article['title'] = row['title']
+            article['summary'] = row['summary']
+            if row['category']:
+                article['category'] = row['category']
+                article['classifier'] = row['classifier']
+                article['scores'] = json.loads(row['scores'] or '{}')
+                article['relevance'] = article['scores'].get(row['category'], 0)
+            continue
+        pending.append(article)
+    
+    # Titles and summaries are cleaned together in one batch, which large
+    # ingests spread over worker processes. The text comes out single-spaced,
+    # so nothing downstream needs to normalize it again.
+    cleaned = clean_batch([text for article in pending for text in (article['title'], article['summary'])])
+    for article, title, summary in zip(pending, cleaned[0::2], cleaned[1::2]):
+        article['title'] = title or 'No title'
+        article['summary'] = summary
+    
+    return articles
 
 
+@REGISTRY.timed('stage_seconds', stage='classify')
+def classify_articles(articles):
+    """Classify articles that have no current stored classification"""
+    pending = [article for article in articles if article.get('classifier') != CLASSIFIER_VERSION]
+    for article, result in zip(pending, classify_batch(pending)):
+        article.update(result)
+        article['classifier'] = CLASSIFIER_VERSION
+    return pending
+
 
 def generate_summary(articles):
     """Generate a categorized summary of articles"""
-    # Categorize articles
-    categories = {
-        'World News': [],
-        'Business & Economy': [],
-        'Technology': [],
-        'Politics': [],
-        'Science & Health': [],
-        'Climate & Environment': [],
-        'Other': []
-    }
+    # Categorize articles, keeping the configured section order
+    categories = {category: [] for category in CATEGORIES}
+    categories[FALLBACK_CATEGORY] = []
     
-    # Enhanced keyword-based categorization
+    classify_articles(articles)
     for article in articles:
-        title_lower = article['title'].lower()
-        summary_lower = article.get('summary', '').lower()
-        full_text = title_lower + ' ' + summary_lower
-        
-        # Technology keywords
-        if any(word in full_text for word in ['technology', 'tech', 'ai', 'artificial intelligence', 'software', 'cyber', 
-                                              'digital', 'internet', 'data', 'hack', 'startup', 'silicon valley', 
-                                              'algorithm', 'machine learning', 'robotics', 'automation', 'cloud',
-                                              'google', 'microsoft', 'apple', 'amazon', 'meta', 'nvidia']):
-            categories['Technology'].append(article)
-        # Business & Economy keywords
-        elif any(word in full_text for word in ['economy', 'market', 'business', 'finance', 'stock', 'trade',
-                                                'inflation', 'recession', 'gdp', 'investment', 'bank', 'currency',
-                                                'corporate', 'earnings', 'revenue', 'profit', 'merger', 'acquisition',
-                                                'startup', 'ipo', 'crypto', 'bitcoin', 'dow', 'nasdaq', 's&p']):
-            categories['Business & Economy'].append(article)
-        # Politics keywords
-        elif any(word in full_text for word in ['politics', 'election', 'government', 'minister', 'president',
-                                                'congress', 'senate', 'parliament', 'democrat', 'republican',
-                                                'policy', 'legislation', 'vote', 'campaign', 'candidate',
-                                                'diplomatic', 'embassy', 'sanctions', 'treaty', 'summit']):
-            categories['Politics'].append(article)
-        # Science & Health keywords
-        elif any(word in full_text for word in ['science', 'research', 'study', 'health', 'medical', 'disease',
-                                                'vaccine', 'drug', 'treatment', 'hospital', 'doctor', 'patient',
-                                                'discovery', 'breakthrough', 'scientist', 'laboratory', 'clinical',
-                                                'mental health', 'pandemic', 'virus', 'bacteria', 'dna']):
-            categories['Science & Health'].append(article)
-        # Climate & Environment keywords
-        elif any(word in full_text for word in ['climate', 'environment', 'weather', 'storm', 'hurricane', 'flood',
-                                                'drought', 'wildfire', 'temperature', 'global warming', 'carbon',
-                                                'renewable', 'solar', 'wind', 'energy', 'sustainability', 'pollution',
-                                                'conservation', 'biodiversity', 'ocean', 'forest', 'arctic']):
-            categories['Climate & Environment'].append(article)
-        # World News keywords
-        elif any(word in full_text for word in ['world', 'international', 'global', 'nation', 'country', 
-                                                'conflict', 'war', 'peace', 'refugee', 'crisis', 'humanitarian',
-                                                'united nations', 'nato', 'military', 'defense', 'security']):
-            categories['World News'].append(article)
-        else:
-            categories['Other'].append(article)
+        categories[article['category']].append(article)
+    
+    # Most relevant articles first within each category
+    for category_articles in categories.values():
+        category_articles.sort(key=lambda article: article.get('relevance', 0), reverse=True)
     
     return categories
 
 
-def create_pdf(categorized_articles, output_path):
-    """Create a well-formatted PDF document from the categorized articles"""
-    try:
-        # Create archive directory if it doesn't exist
-        archive_path = SETTINGS.get('archive_path', 'archive/')
-        if not os.path.exists(archive_path):
-            os.makedirs(archive_path)
-        
-        # Archive previous summary if it exists
-        if os.path.exists(output_path):
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            archive_name = f"{archive_path}world_summary_{timestamp}.pdf"
-            os.rename(output_path, archive_name)
-            logger.info(f"Archived previous summary to {archive_name}")
-        
-        c = canvas.Canvas(output_path, pagesize=A4)
-        width, height = A4
-        
-        # Title page
-        c.setFont("Helvetica-Bold", 28)
-        c.drawCentredString(width/2, height - 100, "WORLD SUMMARIZE")
-        
-        c.setFont("Helvetica", 16)
-        c.drawCentredString(width/2, height - 140, "Global News Summary")
-        
-        c.setFont("Helvetica", 14)
-        current_time = datetime.now().strftime("%B %d, %Y - %I:%M %p")
-        c.drawCentredString(width/2, height - 170, current_time)
-        
-        # Draw a decorative line
-        c.setLineWidth(2)
-        c.line(100, height - 200, width - 100, height - 200)
-        
-        # Start content
-        y_position = height - 250
-        margin_left = 50
-        margin_right = 50
-        text_width = width - margin_left - margin_right
-        
-        article_count = 0
-        page_count = 1
-        
-        # Process all articles into a single narrative format
-        all_formatted_articles = []
-        
-        for category, articles in categorized_articles.items():
-            if not articles:
+def fetch_stage(feed_urls, feed_cache, store, fetch_urls=None, schedule=None, health=None):
+    """Yield each feed's cleaned articles as soon as its download completes"""
+    # Feeds outside fetch_urls are not due for a poll and contribute the
+    # articles cached from their last download
+    polled = set(feed_urls if fetch_urls is None else fetch_urls)
+    fetch_urls = [url for url in feed_urls if url in polled]
+    probe_urls = []
+    if health is not None:
+        # Sources with an open circuit breaker are skipped like feeds that are
+        # not due, and those ready for a retry get one quick probe
+        fetch_urls, probe_urls, skipped = health.plan(fetch_urls)
+        polled -= set(skipped)
+        if skipped:
+            logger.info(f"Skipping {len(skipped)} failing feeds: {', '.join(skipped)}")
+        if schedule is not None:
+            for url in skipped:
+                schedule.defer(url, health.retry_at(url))
+        fetch_urls += probe_urls
+    request_headers = {url: feed_cache.conditional_headers(url) for url in fetch_urls}
+    # With worker processes available, feeds are cleaned a batch at a time so
+    # the pool gets enough work; otherwise each feed is cleaned as it arrives
+    batch_size = SETTINGS.get('clean_batch_size', 2000) if clean_workers() > 1 else 1
+    pending = []
+    
+    def flush():
+        # Downloads are cached before cleaning changes them in place, so cached
+        # articles are raw wherever they are reused and get cleaned only once
+        for url, headers, feed_articles in pending:
+            if headers is not None:
+                feed_cache.store(url, headers, feed_articles)
+        articles = clean_articles([article for _, _, feed_articles in pending for article in feed_articles], store)
+        pending.clear()
+        return articles
+    
+    for url in feed_urls:
+        cached = feed_cache.stored_articles(url) if url not in polled else None
+        if cached:
+            pending.append((url, None, cached))
+    
+    # Feeds answering 304 reuse their cached articles without being parsed
+    for result in fetch_feeds(fetch_urls, request_headers, probe_urls):
+        url = result['url']
+        if health is not None:
+            health.record_fetch(url, result)
+        if result['error']:
+            # Like a feed behind an open breaker, a failed download keeps
+            # contributing the articles cached from its last good one
+            cached = feed_cache.stored_articles(url)
+            if cached:
+                pending.append((url, None, cached))
+            # A feed the run had no time to start stays due rather than backing off
+            if schedule is not None and not result.get('skipped'):
+                schedule.record(url, error=result['error'])
+            continue
+        cached = feed_cache.cached_articles(url) if result['status'] == 304 else None
+        if cached is not None:
+            pending.append((url, None, cached))
+            new_articles = []
+        else:
+            feed_articles = parse_rss_feed(url, result['content'], result['headers'], health)
+            if feed_articles is None:
+                # A malformed body leaves the cache alone, validators included,
+                # so the feed keeps contributing its last good articles
+                cached = feed_cache.stored_articles(url)
+                if cached:
+                    pending.append((url, None, cached))
+                if schedule is not None:
+                    schedule.record(url, error='malformed feed')
                 continue
-            
-            # Add category header to formatted articles
-            if articles:
-                all_formatted_articles.append({"type": "category", "text": category.upper()})
-            
-            # Show exactly 10 articles per category
-            articles_to_show = min(len(articles), 10)  # Show up to 10 articles per category
-            for article in articles[:articles_to_show]:
-                # Format article with bold title inline
-                title = article['title']  # Don't limit title length
-                raw_summary = article.get('summary', '')
-                source = article.get('source', 'Unknown')
-                
-                # Clean up and create natural summary between 150-300 words
-                if raw_summary:
-                    raw_summary = ' '.join(raw_summary.split())  # Remove extra whitespace
-                    sentences = raw_summary.replace('? ', '?|').replace('! ', '!|').replace('. ', '.|').split('|')
-                    sentences = [s.strip() for s in sentences if s.strip()]
-                    
-                    # Build summary sentence by sentence
-                    summary = ""
-                    word_count = 0
-                    
-                    for sentence in sentences:
-                        sentence_words = len(sentence.split())
-                        new_word_count = word_count + sentence_words
-                        
-                        # Always include at least enough sentences to reach 150 words
-                        if word_count < 150:
-                            summary += sentence + " "
-                            word_count = new_word_count
-                        # Between 150-200 words, keep adding if it doesn't go over 250
-                        elif word_count < 200 and new_word_count <= 250:
-                            summary += sentence + " "
-                            word_count = new_word_count
-                        # Between 200-300, only add if it keeps us under 300
-                        elif new_word_count <= 300:
-                            summary += sentence + " "
-                            word_count = new_word_count
-                        else:
-                            break
-                    
-                    # If we're still under 150 words, add contextual information
-                    if word_count < 150:
-                        additional_context = f"According to {source}, this development represents a significant moment in current events. Industry experts and analysts are closely monitoring the situation as it continues to evolve. The implications of this news could have far-reaching effects on various stakeholders involved. Further updates are expected as more information becomes available from reliable sources. This story is part of ongoing coverage of important global developments."
-                        
-                        context_sentences = additional_context.replace('. ', '.|').split('|')
-                        for sentence in context_sentences:
-                            sentence = sentence.strip()
-                            if sentence:
-                                sentence_words = len(sentence.split())
-                                if word_count + sentence_words <= 300:
-                                    summary += sentence + " "
-                                    word_count += sentence_words
-                                    if word_count >= 150:
-                                        break
-                    
-                    summary = summary.strip()
-                else:
-                    # No summary available, create natural placeholder text
-                    summary = f"This article from {source} provides important coverage of current events. While detailed information is being compiled, initial reports suggest significant developments in this area. The story continues to evolve as journalists gather more information from various sources. Updates will be provided as additional details become available. This news item represents part of the broader coverage of important global events and their potential implications for various stakeholders and communities around the world. Experts are analyzing the situation to better understand its significance and potential impact on related sectors and regions."
-                    
-                formatted_text = f"{title}: {summary}"
-                all_formatted_articles.append({
-                    "type": "article",
-                    "title": title,
-                    "text": formatted_text,
-                    "source": source
-                })
-        
-        # Now render all articles in a flowing format
-        for item in all_formatted_articles:
-            # Check if we need a new page
-            if y_position < 100:
-                # Add page number at bottom
-                c.setFont("Helvetica", 9)
-                c.drawCentredString(width/2, 30, f"Page {page_count}")
-                
-                c.showPage()
-                page_count += 1
-                if page_count > SETTINGS.get('max_pages', 4):
-                    break  # Limit to more pages for detail
-                y_position = height - 50
-            
-            if item["type"] == "category":
-                # Add some space before category
-                y_position -= 20
-                
-                # Category header
-                c.setFont("Helvetica-Bold", 14)
-                c.drawString(margin_left, y_position, item["text"])
-                y_position -= 20
-                
-            elif item["type"] == "article":
-                # Article content
-                c.setFont("Helvetica-Bold", 11)
-                
-                # Split the formatted text to handle title separately
-                parts = item["text"].split(": ", 1)
-                title_text = parts[0]
-                summary_text = parts[1] if len(parts) > 1 else ""
-                
-                # Wrap and draw title
-                title_lines = textwrap.wrap(title_text, width=90)
-                for i, line in enumerate(title_lines[:2]):  # Max 2 lines for title
-                    if i == len(title_lines[:2]) - 1 and summary_text:
-                        # Add colon back to last line of title
-                        line += ":"
-                    c.drawString(margin_left, y_position, line)
-                    y_position -= 14
-                
-                # Switch to regular font for summary
-                c.setFont("Helvetica", 10)
-                
-                # Continue with summary on same line if title was short
-                if len(title_lines) == 1 and summary_text:
-                    # Calculate remaining space on the line
-                    title_width = c.stringWidth(title_text + ": ", "Helvetica-Bold", 11)
-                    x_position = margin_left + title_width
-                    
-                    # Draw first part of summary on same line
-                    remaining_width = text_width - title_width
-                    first_line_chars = int(remaining_width / c.stringWidth("a", "Helvetica", 10))
-                    
-                    if len(summary_text) > first_line_chars:
-                        first_line = summary_text[:first_line_chars]
-                        rest_of_summary = summary_text[first_line_chars:]
-                        
-                        # Go back up one line to continue after title
-                        y_position += 14
-                        c.drawString(x_position, y_position, first_line)
-                        y_position -= 14
-                        
-                        # Wrap remaining summary
-                        wrapped_lines = textwrap.wrap(rest_of_summary, width=100)
-                        for line in wrapped_lines[:6]:  # Allow more lines
-                            c.drawString(margin_left, y_position, line)
-                            y_position -= 12
-                    else:
-                        # Summary fits on same line
-                        y_position += 14
-                        c.drawString(x_position, y_position, summary_text)
-                        y_position -= 14
-                else:
-                    # Wrap summary normally
-                    if summary_text:
-                        wrapped_lines = textwrap.wrap(summary_text, width=100)
-                        for line in wrapped_lines[:7]:  # Allow more lines
-                            c.drawString(margin_left, y_position, line)
-                            y_position -= 12
-                
-                y_position -= 8  # Space between articles
-                article_count += 1
-                
-                # Don't limit by article count, let pages fill up
-                # The page limit will control the content amount
-        
-        # Add page number on last page
-        c.setFont("Helvetica", 9)
-        c.drawCentredString(width/2, 30, f"Page {page_count}")
-        
-        c.save()
-        logger.info(f"PDF created successfully: {output_path}")
+            pending.append((url, result['headers'], feed_articles))
+            known = feed_cache.article_ids(url)
+            new_articles = [article for article in feed_articles if article['id'] not in known]
+        if schedule is not None:
+            schedule.record(url, pending[-1][2], len(new_articles))
+        if sum(len(feed_articles) for _, _, feed_articles in pending) >= batch_size:
+            yield flush()
+    if pending:
+        yield flush()
+
+
+def dedupe_stage(feed_batches):
+    """Yield articles whose exact title has not been seen earlier in the run"""
+    seen_titles = set()
+    for articles in feed_batches:
+        for article in articles:
+            if article['title'] not in seen_titles:
+                seen_titles.add(article['title'])
+                yield article
+
+
+def classify_stage(articles, store, batch_size=100):
+    """Classify articles in bounded batches and persist what changed"""
+    total = new = 0
+    for batch in iter(lambda: list(itertools.islice(articles, batch_size)), []):
+        new_articles = classify_articles(batch)
+        new_ids = {article['id'] for article in new_articles}
+        # Persist only what changed; everything else just gets its last_seen refreshed
+        store.save(new_articles)
+        store.touch(article['id'] for article in batch if article['id'] not in new_ids)
+        total += len(batch)
+        new += len(new_articles)
+        yield from batch
+    
+    REGISTRY.set('articles_collected', total)
+    REGISTRY.set('articles_new', new)
+    logger.info(f"Total unique articles collected: {total} ({new} new or changed since last run)")
+
+
+def cluster_stage(articles, story_index, batch_size=100):
+    """Tag each article with its story cluster"""
+    for batch in iter(lambda: list(itertools.islice(articles, batch_size)), []):
+        story_index.assign(batch)
+        yield from batch
+
+
+def term_stage(articles, stats):
+    """Count term document frequencies for extractive summaries as articles stream past"""
+    for article in articles:
+        stats.add(summary_text(article))
+        yield article
+
+
+def group_stage(articles, per_category):
+    """Collapse story clusters and keep the most relevant stories of each category"""
+    categories = {category: [] for category in CATEGORIES}
+    categories[FALLBACK_CATEGORY] = []
+    retained = {}
+    # Outlets credited to stories whose representative was evicted, handed on
+    # if another version of the story makes it back in
+    credited = {}
+    stories = 0
+    
+    # One bounded min-heap per category, so memory depends on the number of
+    # categories rather than on the number of articles in the run
+    for sequence, article in enumerate(articles):
+        cluster_id = article['cluster_id']
+        representative = retained.get(cluster_id)
+        source = article.get('source')
+        if representative is not None:
+            # Another outlet's version of a story we already hold
+            if source and source != representative.get('source') and source not in representative['also_reported_by']:
+                representative['also_reported_by'].append(source)
+            continue
         
-    except Exception as e:
-        logger.error(f"Error creating PDF: {str(e)}")
-        raise
+        # A story whose representative was evicted gets another chance with this version
+        earlier = credited.pop(cluster_id, None)
+        if earlier is None:
+            stories += 1
+        article['also_reported_by'] = [name for name in dict.fromkeys(earlier or []) if name != source]
+        retained[cluster_id] = article
+        heap = categories[article['category']]
+        heapq.heappush(heap, (article.get('relevance', 0), -sequence, cluster_id, article))
+        if len(heap) > per_category:
+            evicted = heapq.heappop(heap)[3]
+            retained.pop(evicted['cluster_id'], None)
+            sources = [evicted['source']] if evicted.get('source') else []
+            credited[evicted['cluster_id']] = sources + evicted['also_reported_by']
+    
+    REGISTRY.set('stories_collected', stories)
+    logger.info(f"Collected {stories} stories")
+    
+    # Most relevant first, earliest first among equals
+    return {category: [entry[3] for entry in sorted(heap, reverse=True)]
+            for category, heap in categories.items()}
 
 
-def scrape_news():
+def scrape_news(fetch_urls=None):
     """Main function to scrape news and update PDF"""
     logger.info("Starting news scraping session")
-    all_articles = []
+    feed_cache = FeedCache()
+    schedule = FeedSchedule()
+    health = FeedHealth()
+    store = ArticleStore()
+    story_index = StoryIndex()
     
-    # Scrape RSS feeds
-    for rss_url in NEWS_SOURCES['rss_feeds']:
-        try:
-            articles = scrape_rss_feed(rss_url)
-            all_articles.extend(articles)
-        except Exception as e:
-            logger.error(f"Failed to scrape {rss_url}: {str(e)}")
-            continue
-    
-    # Remove duplicates based on title
-    seen_titles = set()
-    unique_articles = []
-    for article in all_articles:
-        if article['title'] not in seen_titles:
-            seen_titles.add(article['title'])
-            unique_articles.append(article)
+    try:
+        # fetch -> clean -> dedupe -> classify -> cluster -> group, one article at a time
+        articles = dedupe_stage(fetch_stage(NEWS_SOURCES['rss_feeds'], feed_cache, store, fetch_urls,
+                                            schedule, health))
+        articles = cluster_stage(classify_stage(articles, store), story_index)
+        term_stats = None
+        if summary_mode() == 'extractive':
+            term_stats = TermStatistics()
+            articles = term_stage(articles, term_stats)
+        # Each category keeps a deeper pool than the edition shows, for custom editions
+        per_category = SETTINGS.get('max_articles_per_category', 10)
+        pool = group_stage(articles, max(per_category, SETTINGS.get('custom_edition_pool_size', 40)))
+        categorized_articles = {category: stories[:per_category] for category, stories in pool.items()}
+        
+        # Only the stories that made the cut get summaries, including the deeper
+        # pool custom editions draw on; the edition's own stories come first so
+        # they are enriched first within the crawl budget
+        shown = [article for articles in categorized_articles.values() for article in articles]
+        extra = [article for category, stories in pool.items() for article in stories[per_category:]]
+        summarize_batch(shown + extra, term_stats)
+    finally:
+        feed_cache.save()
+        health.save()
+        story_index.prune()
+        story_index.close()
+        store.close()
     
-    logger.info(f"Total unique articles collected: {len(unique_articles)}")
+    logger.info(f"Feed cache: {feed_cache.stats['hits']} hits, {feed_cache.stats['misses']} misses, "
+                f"{feed_cache.stats['not_modified']} not modified")
     
-    # Generate categorized summary
-    categorized_articles = generate_summary(unique_articles)
+    for category, category_articles in categorized_articles.items():
+        REGISTRY.set('articles_published', len(category_articles), category=category)
     
-    # Create PDF
-    output_path = SETTINGS.get('pdf_output_path', 'world_summary.pdf')
-    create_pdf(categorized_articles, output_path)
+    # Lay out the edition once, render it to every output format and swap it in
+    publish_edition(build_document(categorized_articles), REGISTRY, pool)
+    schedule.published()
+    schedule.save()
     
+    stage_times = dict(REGISTRY.totals('stage_seconds', 'stage'))
+    stage_times['render'] = sum(REGISTRY.totals('render_seconds', 'format').values())
+    logger.info(f"Run took {time.time() - REGISTRY.started_at:.2f}s: "
+                + ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in stage_times.items())
+                + f" (plus {sum(REGISTRY.totals('fetch_seconds', 'host').values()):.2f}s of downloads in parallel)")
     logger.info("News scraping session completed successfully")
 
 
+def poll_feeds():
+    """Poll the feeds that are due and publish a new edition once enough new stories have arrived"""
+    feed_urls = NEWS_SOURCES['rss_feeds']
+    # The profile covers the whole job, so an edition built from this poll's
+    # downloads keeps their fetch and parse timings
+    REGISTRY.reset()
+    schedule = FeedSchedule()
+    due = schedule.due(feed_urls)
+    if due:
+        feed_cache = FeedCache()
+        health = FeedHealth()
+        store = ArticleStore()
+        try:
+            # Downloads land in the feed cache; the edition is built from it below
+            for _ in fetch_stage(due, feed_cache, store, schedule=schedule, health=health):
+                pass
+        finally:
+            feed_cache.save()
+            health.save()
+            store.close()
+            schedule.save()
+        logger.info(f"Polled {len(due)} of {len(feed_urls)} feeds, {schedule.pending_new} new articles pending")
+    
+    if schedule.should_publish():
+        # Every feed's articles are already cached, so nothing is downloaded again
+        scrape_news(fetch_urls=[])
+
+
 def main():
     """WorldSummarize main function"""
     try:
         logger.info("WorldSummarize started")
+        # Each run gets a fresh profile, written next to the edition it produces
+        REGISTRY.reset()
         scrape_news()
     except Exception as e:
         logger.error(f"Fatal error in main: {str(e)}")